@@ -0,0 +1,40 @@
+"""hackathon stats history
+
+Revision ID: 0a8d5e3c91b2
+Revises: f1b7c3e82a64
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a8d5e3c91b2'
+down_revision: Union[str, None] = 'f1b7c3e82a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('hackathon_stats_history',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('hackathon_id', sa.Integer(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('resolution', sa.String(length=8), nullable=False),
+    sa.Column('total_teams', sa.Integer(), nullable=False),
+    sa.Column('incomplete_teams', sa.Integer(), nullable=False),
+    sa.Column('total_participants', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['hackathon_id'], ['hackathons.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_hackathon_stats_history_recorded_at', 'hackathon_stats_history', ['recorded_at'], unique=False, postgresql_using='brin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_hackathon_stats_history_recorded_at', table_name='hackathon_stats_history')
+    op.drop_table('hackathon_stats_history')
@@ -0,0 +1,28 @@
+"""hackathons start_date, id index
+
+Revision ID: 7b2e9c41d5a8
+Revises: 5cf23d3137c3
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e9c41d5a8'
+down_revision: Union[str, None] = '5cf23d3137c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_hackathons_start_date_id', 'hackathons', ['start_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_hackathons_start_date_id', table_name='hackathons')
@@ -0,0 +1,57 @@
+"""hackathon stats history: one point per bucket
+
+Revision ID: b5d2e8f4c617
+Revises: 8c4e1f9a2b73
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2e8f4c617'
+down_revision: Union[str, None] = '8c4e1f9a2b73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # прежнее прореживание переносило по одной минуте и плодило точки одного интервала:
+    # оставляем последнюю вставленную
+    op.execute(
+        """
+        DELETE FROM hackathon_stats_history h
+        USING hackathon_stats_history newer
+        WHERE newer.hackathon_id = h.hackathon_id
+          AND newer.resolution = h.resolution
+          AND newer.recorded_at = h.recorded_at
+          AND newer.id > h.id
+        """
+    )
+    op.drop_index('ix_hackathon_stats_history_recorded_at', table_name='hackathon_stats_history')
+    op.create_unique_constraint(
+        'uq_hackathon_stats_history_point',
+        'hackathon_stats_history',
+        ['hackathon_id', 'resolution', 'recorded_at'],
+    )
+    op.create_index(
+        'ix_hackathon_stats_history_hackathon_recorded',
+        'hackathon_stats_history',
+        ['hackathon_id', 'recorded_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_hackathon_stats_history_hackathon_recorded', table_name='hackathon_stats_history'
+    )
+    op.drop_constraint(
+        'uq_hackathon_stats_history_point', 'hackathon_stats_history', type_='unique'
+    )
+    op.create_index('ix_hackathon_stats_history_recorded_at', 'hackathon_stats_history', ['recorded_at'], unique=False, postgresql_using='brin')
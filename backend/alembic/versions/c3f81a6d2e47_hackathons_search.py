@@ -0,0 +1,51 @@
+"""hackathons full-text and tag search
+
+Revision ID: c3f81a6d2e47
+Revises: 7b2e9c41d5a8
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f81a6d2e47'
+down_revision: Union[str, None] = '7b2e9c41d5a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('hackathons', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
+    op.add_column('hackathons', sa.Column(
+        'tag_list',
+        postgresql.ARRAY(sa.Text()),
+        sa.Computed(
+            r"array_remove(regexp_split_to_array(lower(btrim(coalesce(tags, ''))), "
+            r"'\s*,\s*'), '')",
+            persisted=True,
+        ),
+    ))
+    op.create_index('ix_hackathons_search_vector', 'hackathons', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_hackathons_tag_list', 'hackathons', ['tag_list'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_hackathons_tag_list', table_name='hackathons')
+    op.drop_index('ix_hackathons_search_vector', table_name='hackathons')
+    op.drop_column('hackathons', 'tag_list')
+    op.drop_column('hackathons', 'search_vector')
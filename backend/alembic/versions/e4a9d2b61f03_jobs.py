@@ -0,0 +1,53 @@
+"""jobs
+
+Revision ID: e4a9d2b61f03
+Revises: c3f81a6d2e47
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9d2b61f03'
+down_revision: Union[str, None] = 'c3f81a6d2e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=32), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'DONE', 'FAILED', name='jobstatusenum'), nullable=False),
+    sa.Column('organizer_id', sa.Integer(), nullable=False),
+    sa.Column('hackathon_id', sa.Integer(), nullable=False),
+    sa.Column('params', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('progress', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('result_path', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['hackathon_id'], ['hackathons.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['organizer_id'], ['organizers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_status_id', 'jobs', ['status', 'id'], unique=False)
+    op.create_index(op.f('ix_jobs_organizer_id'), 'jobs', ['organizer_id'], unique=False)
+    op.create_index(op.f('ix_jobs_hackathon_id'), 'jobs', ['hackathon_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_jobs_hackathon_id'), table_name='jobs')
+    op.drop_index(op.f('ix_jobs_organizer_id'), table_name='jobs')
+    op.drop_index('ix_jobs_status_id', table_name='jobs')
+    op.drop_table('jobs')
+    sa.Enum(name='jobstatusenum').drop(op.get_bind(), checkfirst=True)
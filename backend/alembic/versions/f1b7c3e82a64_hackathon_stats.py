@@ -0,0 +1,71 @@
+"""hackathon stats
+
+Revision ID: f1b7c3e82a64
+Revises: e4a9d2b61f03
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7c3e82a64'
+down_revision: Union[str, None] = 'e4a9d2b61f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('hackathon_stats',
+    sa.Column('hackathon_id', sa.Integer(), nullable=False),
+    sa.Column('total_teams', sa.Integer(), nullable=False),
+    sa.Column('incomplete_teams', sa.Integer(), nullable=False),
+    sa.Column('total_participants', sa.Integer(), nullable=False),
+    sa.Column('role_counts', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['hackathon_id'], ['hackathons.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('hackathon_id')
+    )
+    # заполняем счётчики для уже существующих хакатонов
+    op.execute("""
+        INSERT INTO hackathon_stats (
+            hackathon_id, total_teams, incomplete_teams, total_participants, role_counts, updated_at
+        )
+        SELECT h.id,
+               COALESCE(t.total_teams, 0),
+               COALESCE(t.incomplete_teams, 0),
+               COALESCE(r.total_participants, 0),
+               COALESCE(r.role_counts, '{}'::jsonb),
+               now()
+        FROM hackathons h
+        LEFT JOIN (
+            SELECT hackathon_id,
+                   count(*) AS total_teams,
+                   count(*) FILTER (WHERE is_completed = false) AS incomplete_teams
+            FROM teams
+            GROUP BY hackathon_id
+        ) t ON t.hackathon_id = h.id
+        LEFT JOIN (
+            SELECT hackathon_id, sum(members) AS total_participants,
+                   jsonb_object_agg(role, members) AS role_counts
+            FROM (
+                SELECT teams.hackathon_id, COALESCE(team_members.role::text, 'None') AS role,
+                       count(*) AS members
+                FROM team_members
+                JOIN teams ON teams.id = team_members.team_id
+                WHERE team_members.user_id IS NOT NULL
+                GROUP BY 1, 2
+            ) by_role
+            GROUP BY hackathon_id
+        ) r ON r.hackathon_id = h.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('hackathon_stats')
@@ -1,7 +1,7 @@
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 
-from bot.mw import DBSessionMiddleware, ErrorMiddleware
+from bot.mw import DBSessionMiddleware, ErrorMiddleware, UpdateMetricsMiddleware
 from bot.routes import invite_router
 from config import TG_BOT_TOKEN
 from db import db
@@ -14,6 +14,7 @@ async def start_bot():
 
     dp = Dispatcher()
 
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
     dp.message.middleware(ErrorMiddleware())
     dp.callback_query.middleware(ErrorMiddleware())
     dp.callback_query.middleware(DBSessionMiddleware(db.session))
@@ -1,2 +1,10 @@
 from bot.mw.base import ErrorMiddleware, ThrottlingMiddleware
 from bot.mw.db import DBSessionMiddleware
+from bot.mw.metrics import UpdateMetricsMiddleware
+
+__all__ = [
+    "DBSessionMiddleware",
+    "ErrorMiddleware",
+    "ThrottlingMiddleware",
+    "UpdateMetricsMiddleware",
+]
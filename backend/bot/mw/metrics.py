@@ -0,0 +1,30 @@
+import time
+
+from aiogram import BaseMiddleware
+
+from metrics import gauge, histogram
+
+UPDATE_SECONDS = histogram(
+    "bot_update_duration_seconds", "Время обработки апдейта Telegram", ("event_type", "status")
+)
+UPDATES_IN_FLIGHT = gauge("bot_updates_in_flight", "Апдейты Telegram в обработке")
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Внешний middleware на dp.update: замеряет обработку апдейта целиком."""
+
+    async def __call__(self, handler, event, data):
+        start = time.perf_counter()
+        status = "error"
+        UPDATES_IN_FLIGHT.inc()
+        try:
+            result = await handler(event, data)
+            status = "ok"
+            return result
+        finally:
+            UPDATES_IN_FLIGHT.dec()
+            UPDATE_SECONDS.observe(
+                time.perf_counter() - start,
+                event_type=getattr(event, "event_type", "unknown"),
+                status=status,
+            )
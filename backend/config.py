@@ -32,8 +32,73 @@ DB_NAME = config("DB_NAME")
 DB_USERNAME = config("DB_USERNAME")
 DB_PASSWORD = config("DB_PASSWORD")
 
+DB_POOL_SIZE = config("DB_POOL_SIZE", cast=int, default=10)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", cast=int, default=10)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", cast=float, default=10)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", cast=int, default=1800)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", cast=bool, default=True)
+DB_STATEMENT_CACHE_SIZE = config("DB_STATEMENT_CACHE_SIZE", cast=int, default=100)
+DB_STATEMENT_TIMEOUT_MS = config("DB_STATEMENT_TIMEOUT_MS", cast=int, default=30000)
+
+# реплика для публичных read-only эндпоинтов (пусто — всё читается с primary)
+DB_REPLICA_DSN = config("DB_REPLICA_DSN", default="")
+DB_REPLICA_MAX_LAG_SECONDS = config("DB_REPLICA_MAX_LAG_SECONDS", cast=float, default=5)
+
+# общий кэш для нескольких воркеров: redis://host:6379/0 (пусто — кэш в памяти процесса)
+CACHE_URL = config("CACHE_URL", default="")
+CACHE_TTL = config("CACHE_TTL", cast=float, default=60)
+
+# кэш строк хакатонов (HACK_CACHE_ENABLED=False отключает, например в тестах)
+HACK_CACHE_ENABLED = config("HACK_CACHE_ENABLED", cast=bool, default=True)
+HACK_CACHE_SIZE = config("HACK_CACHE_SIZE", cast=int, default=1024)
+HACK_CACHE_TTL = config("HACK_CACHE_TTL", cast=float, default=60)
+# кэш существования организаторов для проверки токенов. Инвалидации нет:
+# удалённый организатор сохраняет доступ до ORGANIZER_CACHE_TTL секунд
+ORGANIZER_CACHE_SIZE = config("ORGANIZER_CACHE_SIZE", cast=int, default=1024)
+ORGANIZER_CACHE_TTL = config("ORGANIZER_CACHE_TTL", cast=float, default=30)
+
+# фоновые задачи (экспорт, массовые операции): одновременно занимают не больше
+# JOBS_CONCURRENCY соединений из пула
+JOBS_ENABLED = config("JOBS_ENABLED", cast=bool, default=True)
+JOBS_CONCURRENCY = config("JOBS_CONCURRENCY", cast=int, default=2)
+JOBS_POLL_INTERVAL = config("JOBS_POLL_INTERVAL", cast=float, default=2)
+JOBS_STALE_SECONDS = config("JOBS_STALE_SECONDS", cast=float, default=600)
+JOBS_DIR = config("JOBS_DIR", default="job_artifacts")
+# задача, воркер которой падал JOBS_MAX_ATTEMPTS раз, помечается failed
+JOBS_MAX_ATTEMPTS = config("JOBS_MAX_ATTEMPTS", cast=int, default=3)
+# файлы выгрузок удаляются через JOBS_RESULT_TTL_HOURS после завершения задачи
+JOBS_RESULT_TTL_HOURS = config("JOBS_RESULT_TTL_HOURS", cast=float, default=24)
+JOBS_CLEANUP_INTERVAL = config("JOBS_CLEANUP_INTERVAL", cast=float, default=3600)
+# сверка hackathon_stats с таблицами команд, секунды (0 отключает)
+STATS_RECONCILE_INTERVAL = config("STATS_RECONCILE_INTERVAL", cast=float, default=600)
+# история аналитики: минутные снимки, через сутки — часовые, через 30 дней — дневные
+STATS_SNAPSHOT_INTERVAL = config("STATS_SNAPSHOT_INTERVAL", cast=float, default=60)
+STATS_MINUTE_RETENTION_HOURS = config("STATS_MINUTE_RETENTION_HOURS", cast=float, default=24)
+STATS_HOUR_RETENTION_DAYS = config("STATS_HOUR_RETENTION_DAYS", cast=float, default=30)
+
+# события хакатонов (SSE/WebSocket): очередь на клиента и интервал keep-alive
+EVENTS_QUEUE_SIZE = config("EVENTS_QUEUE_SIZE", cast=int, default=100)
+EVENTS_HEARTBEAT_SECONDS = config("EVENTS_HEARTBEAT_SECONDS", cast=float, default=15)
+
+# индекс навыков для подбора команд: живёт до изменения состава или профилей
+# участников, но не дольше TTL
+MATCHING_INDEX_TTL = config("MATCHING_INDEX_TTL", cast=float, default=300)
+MATCHING_INDEX_SIZE = config("MATCHING_INDEX_SIZE", cast=int, default=64)
+
+# PBKDF2-SHA256 для паролей организаторов: итерации (хэши с другим числом
+# пересчитываются при входе), потоки пула и предел очереди до ответа 503
+PASSWORD_HASH_ITERATIONS = config("PASSWORD_HASH_ITERATIONS", cast=int, default=100_000)
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", cast=int, default=2)
+PASSWORD_HASH_QUEUE = config("PASSWORD_HASH_QUEUE", cast=int, default=64)
+
 SECRET_KEY = config("SECRET_KEY")
 JWT_EXPIRE_MINUTES = config("JWT_EXPIRE_MINUTES", cast=int, default=1440)
+# refresh-токены: срок жизни цепочки ротации; отозванные токены — фильтр Блума
+# в каждом воркере, сверяется с таблицей revoked_tokens раз в REVOCATION_SYNC_INTERVAL
+REFRESH_TOKEN_DAYS = config("REFRESH_TOKEN_DAYS", cast=int, default=14)
+REVOCATION_BLOOM_CAPACITY = config("REVOCATION_BLOOM_CAPACITY", cast=int, default=100_000)
+REVOCATION_BLOOM_ERROR_RATE = config("REVOCATION_BLOOM_ERROR_RATE", cast=float, default=0.001)
+REVOCATION_SYNC_INTERVAL = config("REVOCATION_SYNC_INTERVAL", cast=float, default=300)
 TG_BOT_TOKEN = config("TG_BOT_TOKEN")
 
 
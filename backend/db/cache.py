@@ -0,0 +1,350 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from contextlib import suppress
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+
+from metrics import counter
+
+try:
+    from redis import asyncio as redis
+except ImportError:  # необязательная зависимость: без неё работает только MemoryCacheBackend
+    redis = None
+
+CACHE_HITS = counter("cache_hits", "Попадания в кэш", ("cache",))
+CACHE_MISSES = counter("cache_misses", "Промахи кэша", ("cache",))
+CACHE_EVICTIONS = counter("cache_evictions", "Вытеснения и истечения TTL", ("cache",))
+CACHE_ERRORS = counter("cache_backend_errors", "Ошибки обращения к общему кэшу", ("cache",))
+
+CACHE_RECONNECTS = counter(
+    "cache_listener_reconnects", "Переподключения слушателя канала инвалидации"
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Значения общего кэша — JSON, а не pickle: запись в кэш-сервер не должна
+# давать выполнение кода в воркерах. Даты восстанавливаются по метке типа,
+# перечисления сохраняются значением (модель собирает их обратно сама).
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj: dict) -> Any:
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    if "__date__" in obj:
+        return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+def dumps(value: Any) -> bytes:
+    return json.dumps(value, default=_encode, ensure_ascii=False).encode()
+
+
+def loads(raw: bytes) -> Any:
+    return json.loads(raw, object_hook=_decode)
+
+
+class TTLCache:
+    """Ограниченный по размеру LRU-кэш с временем жизни записей.
+
+    Хранит только простые данные (словари колонок и т.п.), а не ORM-объекты,
+    привязанные к сессии.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60, enabled: bool = True):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        if not self.enabled:
+            return None
+
+        item = self._data.get(key)
+        if item is None:
+            CACHE_MISSES.inc(cache=self.name)
+            return None
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            CACHE_EVICTIONS.inc(cache=self.name)
+            CACHE_MISSES.inc(cache=self.name)
+            return None
+
+        self._data.move_to_end(key)
+        CACHE_HITS.inc(cache=self.name)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        if not self.enabled:
+            return
+
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            CACHE_EVICTIONS.inc(cache=self.name)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._data if isinstance(key, str) and key.startswith(prefix)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "hits": CACHE_HITS.value(cache=self.name),
+            "misses": CACHE_MISSES.value(cache=self.name),
+            "evictions": CACHE_EVICTIONS.value(cache=self.name),
+        }
+
+
+# служебное сообщение слушателям: сбросить всё, т.к. часть инвалидаций могла потеряться
+RESET_MESSAGE = "*"
+
+
+class CacheBackend:
+    """Хранилище байтов с TTL и каналом инвалидации между воркерами."""
+
+    async def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+    async def publish(self, message: str) -> None:
+        raise NotImplementedError
+
+    async def start(self, on_message: Callable[[str], None]) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Кэш в памяти процесса, подходит для одного воркера."""
+
+    def __init__(self, maxsize: int = 4096):
+        self._data = TTLCache("shared_memory", maxsize=maxsize)
+        self._on_message: Callable[[str], None] | None = None
+
+    async def get(self, key: str) -> bytes | None:
+        return self._data.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data.set(key, value, ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.invalidate(key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        self._data.invalidate_prefix(prefix)
+
+    async def publish(self, message: str) -> None:
+        if self._on_message is not None:
+            self._on_message(message)
+
+    async def start(self, on_message: Callable[[str], None]) -> None:
+        self._on_message = on_message
+
+
+class RedisCacheBackend(CacheBackend):
+    """Общий кэш на Redis-совместимом сервере, инвалидация через pub/sub."""
+
+    def __init__(
+        self,
+        url: str,
+        channel: str = "cache:invalidate",
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 30,
+    ):
+        if redis is None:
+            raise ImportError("CACHE_URL задан, но пакет redis не установлен")
+        self._redis = redis.from_url(url)
+        self._channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._listener: asyncio.Task | None = None
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._redis.set(key, value, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._redis.unlink(*keys)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        keys = [key async for key in self._redis.scan_iter(match=f"{prefix}*", count=500)]
+        if keys:
+            await self._redis.unlink(*keys)
+
+    async def publish(self, message: str) -> None:
+        await self._redis.publish(self._channel, message)
+
+    async def start(self, on_message: Callable[[str], None]) -> None:
+        self._listener = asyncio.create_task(self._listen(on_message))
+
+    async def _listen(self, on_message: Callable[[str], None]) -> None:
+        # pubsub redis-py не переподключается сам: после обрыва подписываемся заново
+        delay = self.reconnect_delay
+        resumed = False
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(self._channel)
+                delay = self.reconnect_delay
+                await self._consume(pubsub, on_message, resumed=resumed)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                CACHE_ERRORS.inc(cache="shared")
+                logger.warning("Cache invalidation listener failed, resubscribing", exc_info=True)
+            finally:
+                with suppress(Exception):
+                    await asyncio.shield(pubsub.aclose())
+            resumed = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _consume(self, pubsub, on_message: Callable[[str], None], resumed: bool) -> None:
+        if resumed:
+            # сообщения за время обрыва потеряны: локальные кэши сбрасываются целиком
+            CACHE_RECONNECTS.inc()
+            on_message(RESET_MESSAGE)
+        async for message in pubsub.listen():
+            if message["type"] == "message":
+                data = message["data"]
+                on_message(data.decode() if isinstance(data, bytes) else data)
+        logger.warning("Cache invalidation listener stopped, resubscribing")
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+        await self._redis.aclose()
+
+
+class SharedCache:
+    """Кэш поверх CacheBackend: значения сериализуются в JSON, ошибки бэкенда
+    не ломают запрос, а инвалидации рассылаются всем воркерам.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 60, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._listeners: list[Callable[[str], None]] = []
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "SharedCache":
+        backend = RedisCacheBackend(url) if url else MemoryCacheBackend()
+        return cls(backend, **kwargs)
+
+    def subscribe(self, listener: Callable[[str], None]) -> None:
+        # слушатели сбрасывают локальные кэши по сообщениям из канала инвалидации
+        self._listeners.append(listener)
+
+    def _dispatch(self, message: str) -> None:
+        for listener in self._listeners:
+            try:
+                listener(message)
+            except Exception:
+                logger.exception("Cache invalidation listener failed for %s", message)
+
+    async def start(self) -> None:
+        await self.backend.start(self._dispatch)
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float | None = None,
+        *,
+        store: bool = True,
+    ) -> Any:
+        # store=False: значение читается из кэша, но промах в него не записывается
+        if not self.enabled:
+            return await loader()
+
+        try:
+            raw = await self.backend.get(key)
+        except Exception:
+            CACHE_ERRORS.inc(cache="shared")
+            logger.warning("Shared cache get failed for %s", key, exc_info=True)
+            return await loader()
+
+        if raw is not None:
+            try:
+                value = loads(raw)
+            except ValueError:
+                # запись не в нашем формате (например, оставшаяся от старой версии)
+                logger.warning("Shared cache value for %s is not valid JSON", key)
+            else:
+                CACHE_HITS.inc(cache="shared")
+                return value
+
+        CACHE_MISSES.inc(cache="shared")
+        value = await loader()
+        if not store:
+            return value
+        try:
+            await self.backend.set(key, dumps(value), self.ttl if ttl is None else ttl)
+        except Exception:
+            CACHE_ERRORS.inc(cache="shared")
+            logger.warning("Shared cache set failed for %s", key, exc_info=True)
+        return value
+
+    async def publish(self, message: str) -> None:
+        # сообщение всем воркерам (включая текущий) без удаления ключей
+        try:
+            await self.backend.publish(message)
+        except Exception:
+            CACHE_ERRORS.inc(cache="shared")
+            logger.warning("Shared cache publish failed for %s", message, exc_info=True)
+
+    async def invalidate(self, *keys: str, prefixes: tuple[str, ...] = ()) -> None:
+        try:
+            await self.backend.delete(*keys)
+            for prefix in prefixes:
+                await self.backend.delete_prefix(prefix)
+            for message in (*keys, *prefixes):
+                await self.backend.publish(message)
+        except Exception:
+            CACHE_ERRORS.inc(cache="shared")
+            logger.warning("Shared cache invalidation failed for %s", keys, exc_info=True)
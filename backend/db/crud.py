@@ -1,16 +1,53 @@
-from sqlalchemy import delete, func, select
+import json
+from collections import Counter
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import (
+    Integer,
+    column,
+    delete,
+    func,
+    inspect,
+    literal_column,
+    select,
+    text,
+    tuple_,
+    union,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-
+from sqlalchemy.orm import make_transient_to_detached
+
+from config import (
+    CACHE_TTL,
+    CACHE_URL,
+    HACK_CACHE_ENABLED,
+    HACK_CACHE_SIZE,
+    HACK_CACHE_TTL,
+    ORGANIZER_CACHE_SIZE,
+    ORGANIZER_CACHE_TTL,
+)
+from db.cache import RESET_MESSAGE, SharedCache, TTLCache
+from db.loading import HACK_SUMMARY, PARTICIPANT_CARD
 from db.models import (
     HackathonModel,
+    HackathonStatsHistoryModel,
+    HackathonStatsModel,
     InviteModel,
     InviteStatusEnum,
     InviteTypeEnum,
+    JobModel,
+    JobStatusEnum,
+    OrganizerModel,
     ParticipantsModel,
     ProfileModel,
     ProfileSkillModel,
+    RevokedTokenModel,
     RoleType,
     SkillModel,
+    SkillType,
     TeamMemberModel,
     TeamModel,
     UserModel,
@@ -29,15 +66,97 @@ FALLBACK_SKILLS = [
     {"id": 10, "name": "AI", "type": "soft"},
 ]
 
+# строки хакатонов по id; сбрасывается обработчиками, изменяющими хакатон
+hack_cache = TTLCache(
+    "hackathon", maxsize=HACK_CACHE_SIZE, ttl=HACK_CACHE_TTL, enabled=HACK_CACHE_ENABLED
+)
+
+# логины организаторов по id: проверка токена без запроса в БД на каждый вызов.
+# Инвалидации нет: в приложении организаторов не удаляют и не переименовывают,
+# а удалённый вручную в БД теряет доступ не позже чем через ORGANIZER_CACHE_TTL
+organizer_cache = TTLCache("organizer", maxsize=ORGANIZER_CACHE_SIZE, ttl=ORGANIZER_CACHE_TTL)
+
+# общий для воркеров кэш: навыки, списки хакатонов, публичные составы команд
+shared_cache = SharedCache.from_url(CACHE_URL, ttl=CACHE_TTL)
+
+
+def _on_cache_invalidation(message: str) -> None:
+    # сообщения вида "hack:<id>" приходят в том числе от других воркеров
+    if message == RESET_MESSAGE:
+        hack_cache.clear()
+        organizer_cache.clear()
+    elif message.startswith("hack:"):
+        hack_cache.invalidate(int(message.removeprefix("hack:")))
+
+
+shared_cache.subscribe(_on_cache_invalidation)
+
+
+def _from_primary(session: AsyncSession) -> bool:
+    # данные с отстающей реплики не кэшируем: сразу после инвалидации они вернули бы
+    # в кэш старые строки, и все воркеры отдавали бы их до истечения TTL
+    return not session.info.get("replica")
+
+
+def _columns(obj) -> dict:
+    # отложенные (deferred) колонки не трогаем, иначе будет догрузка вне greenlet
+    unloaded = inspect(obj).unloaded
+    return {
+        attr.key: getattr(obj, attr.key)
+        for attr in type(obj).__mapper__.column_attrs
+        if attr.key not in unloaded
+    }
+
 
 async def init_default_skills(session: AsyncSession):
+    added = False
     for skill in FALLBACK_SKILLS:
         exists = await session.execute(
             SkillModel.__table__.select().where(SkillModel.id == skill["id"])
         )
         if not exists.scalar():
             session.add(SkillModel(**skill))
+            added = True
     await session.commit()
+    if added:
+        await shared_cache.invalidate("skills")
+
+
+# канал LISTEN/NOTIFY для событий хакатонов (см. server.events)
+EVENTS_CHANNEL = "hackathon_events"
+
+
+async def notify_event(session: AsyncSession, hack_id: int, event_type: str, **data) -> None:
+    """Ставит событие в текущую транзакцию: Postgres доставит его слушателям после COMMIT."""
+    payload = json.dumps(
+        {"hackathon_id": hack_id, "type": event_type, "data": data}, ensure_ascii=False, default=str
+    )
+    await session.execute(select(func.pg_notify(EVENTS_CHANNEL, payload)))
+
+
+async def notify_vacancies(session: AsyncSession, team_id: int) -> None:
+    """Событие с текущими свободными ролями команды (для подписчиков на вакансии)."""
+    await session.flush()
+    team = await session.get(TeamModel, team_id)
+    if team is None:
+        return
+    roles = await session.scalars(
+        select(TeamMemberModel.role)
+        .where(
+            TeamMemberModel.team_id == team_id,
+            TeamMemberModel.user_id.is_(None) | (TeamMemberModel.user_id == 0),
+        )
+        .order_by(TeamMemberModel.id)
+    )
+    await notify_event(
+        session,
+        team.hackathon_id,
+        "vacancies_changed",
+        team_id=team.id,
+        name=team.name,
+        about=team.about,
+        empty_roles=[role_key(role) for role in roles],
+    )
 
 
 async def create_invite(
@@ -78,6 +197,15 @@ async def get_invites_for_team(session: AsyncSession, team_id: int) -> list[Invi
     return result.scalars().all()
 
 
+async def get_pending_invite_participant_ids(session: AsyncSession, team_id: int) -> list[int]:
+    result = await session.execute(
+        select(InviteModel.participant_id).where(
+            InviteModel.team_id == team_id, InviteModel.status == InviteStatusEnum.PENDING
+        )
+    )
+    return result.scalars().all()
+
+
 async def get_invites_for_participant(
     session: AsyncSession, participant_id: int
 ) -> list[InviteModel]:
@@ -95,6 +223,18 @@ async def update_invite_status(
         return None
     invite.status = status
     session.add(invite)
+    if status == InviteStatusEnum.ACCEPTED:
+        hack_id = await session.scalar(
+            select(TeamModel.hackathon_id).where(TeamModel.id == invite.team_id)
+        )
+        await notify_event(
+            session,
+            hack_id,
+            "invite_accepted",
+            invite_id=invite.id,
+            team_id=invite.team_id,
+            participant_id=invite.participant_id,
+        )
     await session.commit()
     return invite
 
@@ -104,29 +244,134 @@ async def delete_invite(session: AsyncSession, invite_id: int) -> None:
     await session.commit()
 
 
-async def get_hacks(session: AsyncSession, offset: int = 0, limit: int | None = None):
-    q = select(HackathonModel).offset(offset)
-    if limit is not None:
-        q = q.limit(limit)
-    result = await session.execute(q)
-    return result.scalars().all()
+async def get_hacks(
+    session: AsyncSession,
+    offset: int = 0,
+    limit: int | None = None,
+    after: tuple[date, int] | None = None,
+):
+    """Хакатоны в порядке (start_date, id).
+
+    after — ключ последнего хакатона предыдущей страницы: keyset-пагинация
+    идёт по индексу ix_hackathons_start_date_id и не зависит от глубины.
+    """
+
+    async def load():
+        q = (
+            select(HackathonModel)
+            .options(*HACK_SUMMARY)
+            .order_by(HackathonModel.start_date, HackathonModel.id)
+        )
+        if after is not None:
+            q = q.where(tuple_(HackathonModel.start_date, HackathonModel.id) > tuple_(*after))
+        else:
+            q = q.offset(offset)
+        if limit is not None:
+            q = q.limit(limit)
+        result = await session.execute(q)
+        return [_columns(hack) for hack in result.scalars().all()]
+
+    cursor = f"{after[0].isoformat()}:{after[1]}" if after is not None else ""
+    rows = await shared_cache.get_or_load(
+        f"hacks:all:{cursor}:{offset}:{limit}", load, store=_from_primary(session)
+    )
+    return [HackathonModel(**row) for row in rows]
 
 
 async def count_hacks(session: AsyncSession) -> int:
-    result = await session.execute(select(func.count()).select_from(HackathonModel))
-    return int(result.scalar_one())
+    # точное значение кэшируется и сбрасывается вместе со списками (префикс "hacks:")
+    async def load():
+        result = await session.execute(select(func.count()).select_from(HackathonModel))
+        return int(result.scalar_one())
+
+    return await shared_cache.get_or_load("hacks:count", load, store=_from_primary(session))
+
+
+async def search_hacks(
+    session: AsyncSession,
+    query: str | None = None,
+    tags: list[str] | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    offset: int = 0,
+    limit: int = 20,
+) -> tuple[list[HackathonModel], int]:
+    """Полнотекстовый поиск по названию и описанию с фильтрами по тегам и датам.
+
+    Возвращает страницу хакатонов и общее число совпадений (одним запросом).
+    """
+    total = func.count().over().label("total")
+    q = select(HackathonModel, total).options(*HACK_SUMMARY)
+
+    if query:
+        ts_query = func.websearch_to_tsquery(literal_column("'russian'::regconfig"), query)
+        q = q.where(HackathonModel.search_vector.op("@@")(ts_query)).order_by(
+            func.ts_rank_cd(HackathonModel.search_vector, ts_query).desc()
+        )
+    if tags:
+        # tag_list @> ARRAY[...] — работает через GIN-индекс ix_hackathons_tag_list
+        q = q.where(HackathonModel.tag_list.contains([tag.strip().lower() for tag in tags]))
+    if date_from is not None:
+        q = q.where(HackathonModel.end_date >= date_from)
+    if date_to is not None:
+        q = q.where(HackathonModel.start_date <= date_to)
+
+    q = q.order_by(HackathonModel.start_date, HackathonModel.id).offset(offset).limit(limit)
+    rows = (await session.execute(q)).all()
+    return [row.HackathonModel for row in rows], (rows[0].total if rows else 0)
 
 
 async def get_upcoming_hacks(session: AsyncSession):
+    async def load():
+        result = await session.execute(
+            select(HackathonModel)
+            .options(*HACK_SUMMARY)
+            .where(HackathonModel.start_date > func.now())
+        )
+        return [_columns(hack) for hack in result.scalars().all()]
+
+    rows = await shared_cache.get_or_load("hacks:upcoming", load, store=_from_primary(session))
+    return [HackathonModel(**row) for row in rows]
+
+
+async def get_hack_by_id(session: AsyncSession, hack_id: int):
+    row = hack_cache.get(hack_id)
+    if row is not None:
+        # восстанавливаем объект из кэша и привязываем к сессии без запроса в БД,
+        # так что его можно изменять и коммитить как загруженный
+        hack = HackathonModel(**row)
+        make_transient_to_detached(hack)
+        return await session.merge(hack, load=False)
+
     result = await session.execute(
-        select(HackathonModel).where(HackathonModel.start_date > func.now())
+        select(HackathonModel).options(*HACK_SUMMARY).where(HackathonModel.id == hack_id)
     )
-    return result.scalars().all()
+    hack = result.scalars().first()
+    if hack is not None and _from_primary(session):
+        hack_cache.set(hack_id, _columns(hack))
+    return hack
 
 
-async def get_hack_by_id(session: AsyncSession, hack_id: int):
-    result = await session.execute(select(HackathonModel).where(HackathonModel.id == hack_id))
-    return result.scalars().first()
+async def invalidate_hack(hack_id: int) -> None:
+    # хакатон изменился: сбрасываем его строку у всех воркеров и списки хакатонов
+    hack_cache.invalidate(hack_id)
+    await shared_cache.invalidate(f"hack:{hack_id}", prefixes=("hacks:",))
+
+
+async def invalidate_team_rosters(hack_id: int) -> None:
+    await shared_cache.invalidate(f"rosters:{hack_id}")
+
+
+async def get_organizer_login(session: AsyncSession, organizer_id: int) -> str | None:
+    # только колонка login: без загрузки связей организатора
+    login = organizer_cache.get(organizer_id)
+    if login is None:
+        login = await session.scalar(
+            select(OrganizerModel.login).where(OrganizerModel.id == organizer_id)
+        )
+        if login is not None:
+            organizer_cache.set(organizer_id, login)
+    return login
 
 
 async def count_teams_for_hack(session: AsyncSession, hack_id: int) -> int:
@@ -163,7 +408,13 @@ async def create_team(
         team_member = TeamMemberModel(team_id=team.id, user_id=None, role=find_role.value)
         session.add(team_member)
 
+    await bump_hackathon_stats(
+        session, hack_id, teams=1, incomplete_teams=1, roles={role_key(None): 1}
+    )
+    await notify_event(session, hack_id, "team_created", team_id=team.id, name=name)
+    await notify_vacancies(session, team.id)
     await session.commit()
+    await invalidate_team_rosters(hack_id)
     return team
 
 
@@ -197,11 +448,293 @@ async def get_team_members_by_team_id(session: AsyncSession, team_id: int) -> li
     return result.scalars().all()
 
 
-async def get_team_by_id(session: AsyncSession, team_id: int):
-    result = await session.execute(select(TeamModel).where(TeamModel.id == team_id))
+async def get_team_by_id(session: AsyncSession, team_id: int, load: tuple = ()):
+    result = await session.execute(select(TeamModel).options(*load).where(TeamModel.id == team_id))
     return result.scalars().first()
 
 
+async def stream_team_member_rows(session: AsyncSession, hack_id: int, batch_size: int = 500):
+    """Строки (команда, участник, пользователь) через серверный курсор, пачками по batch_size."""
+    result = await session.stream(
+        select(TeamModel, TeamMemberModel, UserModel)
+        .join(TeamMemberModel, TeamModel.id == TeamMemberModel.team_id)
+        .join(UserModel, TeamMemberModel.user_id == UserModel.id)
+        .where(TeamModel.hackathon_id == hack_id)
+        .where(TeamMemberModel.user_id.is_not(None))
+        .order_by(TeamModel.id, UserModel.name)
+        .execution_options(yield_per=batch_size)
+    )
+    async for row in result:
+        yield row
+
+
+async def complete_team(session: AsyncSession, hack_id: int, team_id: int) -> bool:
+    """Помечает команду укомплектованной; True, если этот вызов её и пометил.
+
+    Условный UPDATE вместо проверки загруженного team.is_completed: из двух
+    одновременных одобрений счётчик incomplete_teams уменьшит только одно.
+    """
+    completed = await session.scalar(
+        update(TeamModel)
+        .where(TeamModel.id == team_id, TeamModel.is_completed.is_(False))
+        .values(is_completed=True)
+        .returning(TeamModel.id)
+        .execution_options(synchronize_session=False)
+    )
+    if completed is None:
+        return False
+    await bump_hackathon_stats(session, hack_id, incomplete_teams=-1)
+    return True
+
+
+def role_key(role) -> str:
+    # ключ role_counts: значение роли, "None" для мест без роли (как в аналитике)
+    return role.value if hasattr(role, "value") else str(role)
+
+
+async def bump_hackathon_stats(
+    session: AsyncSession,
+    hack_id: int,
+    teams: int = 0,
+    incomplete_teams: int = 0,
+    roles: dict[str, int] | None = None,
+) -> None:
+    """Атомарно сдвигает счётчики hackathon_stats в текущей транзакции.
+
+    roles — прирост занятых мест по ролям, из него же считается total_participants.
+    """
+    roles = roles or {}
+    participants = sum(roles.values())
+    now = datetime.now(UTC)
+    stats = HackathonStatsModel
+
+    stmt = pg_insert(stats).values(
+        hackathon_id=hack_id,
+        total_teams=teams,
+        incomplete_teams=incomplete_teams,
+        total_participants=participants,
+        role_counts=roles,
+        updated_at=now,
+    )
+    role_counts = stats.role_counts
+    for name, delta in roles.items():
+        current = func.coalesce(stats.role_counts[name].astext.cast(Integer), 0)
+        role_counts = role_counts.op("||")(func.jsonb_build_object(name, current + delta))
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[stats.hackathon_id],
+            set_={
+                "total_teams": stats.total_teams + teams,
+                "incomplete_teams": stats.incomplete_teams + incomplete_teams,
+                "total_participants": stats.total_participants + participants,
+                "role_counts": role_counts,
+                "updated_at": now,
+            },
+        )
+    )
+
+
+async def get_hackathon_stats(session: AsyncSession, hack_id: int) -> dict:
+    """Счётчики аналитики по первичному ключу; без строки — пересчёт и сохранение."""
+    stats = await session.get(HackathonStatsModel, hack_id)
+    if stats is None:
+        await reconcile_hackathon_stats(session, hack_id)
+        await session.commit()
+        stats = await session.get(HackathonStatsModel, hack_id)
+
+    return {
+        "total_teams": stats.total_teams,
+        "incomplete_teams": stats.incomplete_teams,
+        "total_participants": stats.total_participants,
+        "role_distribution": {role: count for role, count in stats.role_counts.items() if count},
+    }
+
+
+RECONCILE_STATS_SQL = """
+INSERT INTO hackathon_stats (
+    hackathon_id, total_teams, incomplete_teams, total_participants, role_counts, updated_at
+)
+SELECT h.id,
+       COALESCE(t.total_teams, 0),
+       COALESCE(t.incomplete_teams, 0),
+       COALESCE(r.total_participants, 0),
+       COALESCE(r.role_counts, '{}'::jsonb),
+       now()
+FROM hackathons h
+LEFT JOIN (
+    SELECT hackathon_id,
+           count(*) AS total_teams,
+           count(*) FILTER (WHERE is_completed = false) AS incomplete_teams
+    FROM teams
+    GROUP BY hackathon_id
+) t ON t.hackathon_id = h.id
+LEFT JOIN (
+    SELECT hackathon_id, sum(members) AS total_participants,
+           jsonb_object_agg(role, members) AS role_counts
+    FROM (
+        SELECT teams.hackathon_id, COALESCE(team_members.role::text, 'None') AS role,
+               count(*) AS members
+        FROM team_members
+        JOIN teams ON teams.id = team_members.team_id
+        WHERE team_members.user_id IS NOT NULL
+        GROUP BY 1, 2
+    ) by_role
+    GROUP BY hackathon_id
+) r ON r.hackathon_id = h.id
+WHERE CAST(:hack_id AS integer) IS NULL OR h.id = CAST(:hack_id AS integer)
+ON CONFLICT (hackathon_id) DO UPDATE SET
+    total_teams = excluded.total_teams,
+    incomplete_teams = excluded.incomplete_teams,
+    total_participants = excluded.total_participants,
+    role_counts = excluded.role_counts,
+    updated_at = excluded.updated_at
+"""
+
+
+async def reconcile_hackathon_stats(session: AsyncSession, hack_id: int | None = None) -> int:
+    """Пересчитывает hackathon_stats с нуля (для одного хакатона или для всех)."""
+    result = await session.execute(text(RECONCILE_STATS_SQL), {"hack_id": hack_id})
+    return result.rowcount
+
+
+HISTORY_STEPS = ("minute", "hour", "day")
+
+# счётчики — это состояние: повторная точка в том же интервале заменяет прежнюю
+UPSERT_STATS_POINT = """
+ON CONFLICT (hackathon_id, resolution, recorded_at) DO UPDATE
+SET total_teams = EXCLUDED.total_teams,
+    incomplete_teams = EXCLUDED.incomplete_teams,
+    total_participants = EXCLUDED.total_participants
+"""
+
+SNAPSHOT_STATS_SQL = """
+INSERT INTO hackathon_stats_history (
+    hackathon_id, recorded_at, resolution, total_teams, incomplete_teams, total_participants
+)
+SELECT s.hackathon_id, date_trunc('minute', now()), 'minute',
+       s.total_teams, s.incomplete_teams, s.total_participants
+FROM hackathon_stats s
+JOIN hackathons h ON h.id = s.hackathon_id
+WHERE h.end_date >= current_date - 1
+""" + UPSERT_STATS_POINT
+
+# точки старше порога сворачиваются в более крупный шаг: остаётся последнее значение
+# в каждом интервале. Переносятся только целые интервалы (граница порога округляется
+# вниз до :target), поэтому на интервал приходится одна точка, а таблица сжимается
+DOWNSAMPLE_STATS_SQL = """
+WITH moved AS (
+    DELETE FROM hackathon_stats_history
+    WHERE resolution = :source
+      AND recorded_at < date_trunc(:target, now() - make_interval(secs => :older_than))
+    RETURNING hackathon_id, recorded_at, total_teams, incomplete_teams, total_participants
+)
+INSERT INTO hackathon_stats_history (
+    hackathon_id, recorded_at, resolution, total_teams, incomplete_teams, total_participants
+)
+SELECT DISTINCT ON (hackathon_id, date_trunc(:target, recorded_at))
+       hackathon_id, date_trunc(:target, recorded_at), :target,
+       total_teams, incomplete_teams, total_participants
+FROM moved
+ORDER BY hackathon_id, date_trunc(:target, recorded_at), recorded_at DESC
+""" + UPSERT_STATS_POINT
+
+
+async def snapshot_hackathon_stats(session: AsyncSession) -> int:
+    """Добавляет минутную точку истории для идущих и будущих хакатонов."""
+    result = await session.execute(text(SNAPSHOT_STATS_SQL))
+    return result.rowcount
+
+
+async def downsample_hackathon_stats(
+    session: AsyncSession, source: str, target: str, older_than: timedelta
+) -> int:
+    result = await session.execute(
+        text(DOWNSAMPLE_STATS_SQL),
+        {"source": source, "target": target, "older_than": older_than.total_seconds()},
+    )
+    return result.rowcount
+
+
+async def get_hackathon_stats_history(
+    session: AsyncSession, hack_id: int, start: datetime, end: datetime, step: str
+) -> list[dict]:
+    """Последнее значение счётчиков в каждом интервале step на отрезке [start, end]."""
+    if step not in HISTORY_STEPS:
+        raise ValueError(f"Unknown history step: {step}")
+
+    history = HackathonStatsHistoryModel
+    # шаг подставляется литералом: DISTINCT ON и ORDER BY должны совпадать дословно
+    bucket = func.date_trunc(literal_column(f"'{step}'"), history.recorded_at).label("at")
+    result = await session.execute(
+        select(
+            bucket,
+            history.total_teams,
+            history.incomplete_teams,
+            history.total_participants,
+        )
+        .distinct(bucket)
+        .where(
+            history.hackathon_id == hack_id,
+            history.recorded_at >= start,
+            history.recorded_at <= end,
+        )
+        .order_by(bucket, history.recorded_at.desc())
+    )
+    return [row._asdict() for row in result.all()]
+
+
+async def get_hackathon_team_rosters(session: AsyncSession, hack_id: int) -> list[dict]:
+    # команды, участники и пользователи одним запросом
+    q = (
+        select(TeamModel, TeamMemberModel, UserModel)
+        .outerjoin(TeamMemberModel, TeamModel.id == TeamMemberModel.team_id)
+        .outerjoin(UserModel, TeamMemberModel.user_id == UserModel.id)
+        .where(TeamModel.hackathon_id == hack_id)
+        .order_by(TeamModel.id, TeamMemberModel.id)
+    )
+    result = await session.execute(q)
+
+    teams = {}
+    for team, member, user in result.all():
+        if team.id not in teams:
+            teams[team.id] = {
+                "id": team.id,
+                "name": team.name,
+                "is_completed": team.is_completed,
+                "hackathon_id": team.hackathon_id,
+                "members": [],
+            }
+        if member is None:
+            continue
+
+        user_info = {}
+        if member.user_id and user is not None:
+            user_info = {"user_name": user.name, "user_avatar": user.avatar_url}
+        teams[team.id]["members"].append(
+            {
+                "id": member.id,
+                "user_id": member.user_id,
+                "role": member.role.value if hasattr(member.role, "value") else str(member.role),
+                "approved": member.approved,
+                **user_info,
+            }
+        )
+    return list(teams.values())
+
+
+async def get_public_team_rosters(session: AsyncSession, hack_id: int) -> list[dict]:
+    return await shared_cache.get_or_load(
+        f"rosters:{hack_id}",
+        lambda: get_hackathon_team_rosters(session, hack_id),
+        store=_from_primary(session),
+    )
+
+
+async def invalidate_participants(hack_id: int) -> None:
+    # слушатели (индекс подбора команд) сбрасывают данные об участниках хакатона
+    await shared_cache.invalidate(f"participants:{hack_id}")
+
+
 async def create_participant(
     session: AsyncSession, hack_id: int, profile_id: int
 ) -> ParticipantsModel:
@@ -209,6 +742,7 @@ async def create_participant(
     session.add(participant)
     await session.flush()
     await session.commit()
+    await invalidate_participants(hack_id)
     return participant
 
 
@@ -226,7 +760,9 @@ async def get_participant_by_hack_profile(
 
 async def get_participant_by_id(session: AsyncSession, participant_id: int) -> ParticipantsModel:
     result = await session.execute(
-        select(ParticipantsModel).where(ParticipantsModel.id == participant_id)
+        select(ParticipantsModel)
+        .options(*PARTICIPANT_CARD)
+        .where(ParticipantsModel.id == participant_id)
     )
     return result.scalars().first()
 
@@ -235,7 +771,11 @@ async def update_team_members(session: AsyncSession, team_id: int, member_ids: l
     await session.execute(delete(TeamMemberModel).where(TeamMemberModel.team_id == team_id))
     for uid in member_ids:
         session.add(TeamMemberModel(team_id=team_id, user_id=uid))
+    hack_id = await session.scalar(select(TeamModel.hackathon_id).where(TeamModel.id == team_id))
+    await notify_vacancies(session, team_id)
     await session.commit()
+    if hack_id is not None:
+        await invalidate_team_rosters(hack_id)
 
 
 async def add_participant_to_team(session: AsyncSession, team_id: int, participant_id: int) -> None:
@@ -253,17 +793,113 @@ async def add_participant_to_team(session: AsyncSession, team_id: int, participa
 
     team_member = result.scalars().first()
     if team_member:
-        team_member.user_id = participant.profile.user.id
+        team_member.user_id = participant.profile.user_id
         session.add(team_member)
+        await bump_hackathon_stats(
+            session, participant.hackathon_id, roles={role_key(team_member.role): 1}
+        )
+        await notify_event(
+            session,
+            participant.hackathon_id,
+            "member_joined",
+            team_id=team_id,
+            user_id=team_member.user_id,
+            role=role_key(team_member.role),
+        )
+        await notify_vacancies(session, team_id)
         await session.commit()
+        await invalidate_team_rosters(participant.hackathon_id)
     else:
         raise Exception("something went wrong")
 
 
+async def apply_team_assignments(
+    session: AsyncSession, hack_id: int, assignments: list[tuple[int, int]], min_team_size: int
+) -> int | None:
+    """Заполняет свободные места одной транзакцией по парам (member_id, user_id).
+
+    Возвращает число команд, ставших укомплектованными. Если место уже заняли или
+    пользователь успел попасть в другую команду, откатывает всё и возвращает None.
+    """
+    plan = values(
+        column("member_id", Integer), column("user_id", Integer), name="plan"
+    ).data(assignments)
+    filled = (
+        await session.execute(
+            update(TeamMemberModel)
+            .where(
+                TeamMemberModel.id == plan.c.member_id,
+                TeamMemberModel.user_id.is_(None) | (TeamMemberModel.user_id == 0),
+            )
+            .values(user_id=plan.c.user_id)
+            .returning(TeamMemberModel.team_id, TeamMemberModel.role)
+            .execution_options(synchronize_session=False)
+        )
+    ).all()
+
+    doubled = await session.scalar(
+        select(func.count()).select_from(
+            select(TeamMemberModel.user_id)
+            .join(TeamModel, TeamMemberModel.team_id == TeamModel.id)
+            .where(
+                TeamModel.hackathon_id == hack_id,
+                TeamMemberModel.user_id.in_([user_id for _, user_id in assignments]),
+            )
+            .group_by(TeamMemberModel.user_id)
+            .having(func.count() > 1)
+            .subquery()
+        )
+    )
+    if len(filled) != len(assignments) or doubled:
+        await session.rollback()
+        return None
+
+    team_ids = sorted({team_id for team_id, _ in filled})
+    members = (
+        select(func.count(TeamMemberModel.id))
+        .where(TeamMemberModel.team_id == TeamModel.id, TeamMemberModel.user_id != 0)
+        .correlate(TeamModel)
+        .scalar_subquery()
+    )
+    completed = (
+        await session.scalars(
+            update(TeamModel)
+            .where(
+                TeamModel.id.in_(team_ids),
+                TeamModel.is_completed.is_(False),
+                members >= min_team_size,
+            )
+            .values(is_completed=True)
+            .returning(TeamModel.id)
+            .execution_options(synchronize_session=False)
+        )
+    ).all()
+
+    await bump_hackathon_stats(
+        session,
+        hack_id,
+        incomplete_teams=-len(completed),
+        roles=dict(Counter(role_key(role) for _, role in filled)),
+    )
+    await notify_event(
+        session, hack_id, "participants_assigned", assigned=len(filled), completed=len(completed)
+    )
+    for team_id in team_ids:
+        await notify_vacancies(session, team_id)
+    await session.commit()
+    await invalidate_team_rosters(hack_id)
+    return len(completed)
+
+
 async def delete_participant_by_id(session: AsyncSession, participant_id: int):
+    hack_id = await session.scalar(
+        select(ParticipantsModel.hackathon_id).where(ParticipantsModel.id == participant_id)
+    )
     await session.execute(delete(InviteModel).where(InviteModel.participant_id == participant_id))
     await session.execute(delete(ParticipantsModel).where(ParticipantsModel.id == participant_id))
     await session.commit()
+    if hack_id is not None:
+        await invalidate_participants(hack_id)
 
 
 async def get_user_by_id(session: AsyncSession, user_id: int) -> UserModel:
@@ -372,6 +1008,23 @@ async def update_profile_about(
     return profile
 
 
+async def invalidate_profile_matching(session: AsyncSession, profile_id: int) -> None:
+    # роль и навыки профиля входят в индекс подбора: и как участника хакатона,
+    # и как члена команды (места команды берут навыки всех профилей пользователя)
+    user_id = select(ProfileModel.user_id).where(ProfileModel.id == profile_id).scalar_subquery()
+    hack_ids = await session.scalars(
+        select(ParticipantsModel.hackathon_id)
+        .where(ParticipantsModel.profile_id == profile_id)
+        .union(
+            select(TeamModel.hackathon_id)
+            .join(TeamMemberModel, TeamMemberModel.team_id == TeamModel.id)
+            .where(TeamMemberModel.user_id == user_id)
+        )
+    )
+    for hack_id in hack_ids.all():
+        await invalidate_participants(hack_id)
+
+
 async def update_profile_role(
     session: AsyncSession, profile: ProfileModel, role: str
 ) -> ProfileModel:
@@ -380,6 +1033,7 @@ async def update_profile_role(
     await session.flush()
     await session.refresh(profile)
     await session.commit()
+    await invalidate_profile_matching(session, profile.id)
     return profile
 
 
@@ -404,6 +1058,7 @@ async def set_profile_skills(session: AsyncSession, profile_id: int, skill_ids:
         session.add(ProfileSkillModel(profile_id=profile_id, skill_id=sid))
 
     await session.commit()
+    await invalidate_profile_matching(session, profile_id)
 
 
 async def get_profile_skill_ids(session: AsyncSession, profile_id: int) -> list[int]:
@@ -414,8 +1069,13 @@ async def get_profile_skill_ids(session: AsyncSession, profile_id: int) -> list[
 
 
 async def get_skills(session: AsyncSession):
-    result = await session.execute(select(SkillModel))
-    return result.scalars().all()
+    async def load():
+        result = await session.execute(select(SkillModel))
+        return [_columns(skill) for skill in result.scalars().all()]
+
+    rows = await shared_cache.get_or_load("skills", load, store=_from_primary(session))
+    # из общего кэша тип навыка приходит строкой
+    return [SkillModel(**{**row, "type": SkillType(row["type"])}) for row in rows]
 
 
 async def get_skill_by_id(session: AsyncSession, skill_id: int):
@@ -449,10 +1109,315 @@ async def get_teams_with_empty_members(session: AsyncSession, hackathon_id: int
     return list(teams.values())
 
 
+async def get_matching_rows(session: AsyncSession, hack_id: int) -> dict[str, list[dict]]:
+    """Данные для индекса подбора: участники с id навыков и все места в командах хакатона."""
+    skill_ids = func.array_remove(func.array_agg(ProfileSkillModel.skill_id), None)
+    participants = await session.execute(
+        select(
+            ParticipantsModel.id.label("participant_id"),
+            ProfileModel.user_id,
+            ProfileModel.role,
+            skill_ids.label("skill_ids"),
+        )
+        .join(ProfileModel, ProfileModel.id == ParticipantsModel.profile_id)
+        .outerjoin(ProfileSkillModel, ProfileSkillModel.profile_id == ProfileModel.id)
+        .where(ParticipantsModel.hackathon_id == hack_id)
+        .group_by(ParticipantsModel.id, ProfileModel.user_id, ProfileModel.role)
+        .order_by(ParticipantsModel.id)
+    )
+
+    # навыки занятого места — навыки всех профилей его пользователя
+    member_skills = (
+        select(func.array_agg(func.distinct(ProfileSkillModel.skill_id)))
+        .join(ProfileModel, ProfileModel.id == ProfileSkillModel.profile_id)
+        .where(ProfileModel.user_id == TeamMemberModel.user_id)
+        .correlate(TeamMemberModel)
+        .scalar_subquery()
+    )
+    slots = await session.execute(
+        select(
+            TeamModel.id.label("team_id"),
+            TeamModel.name,
+            TeamModel.about,
+            TeamModel.is_completed,
+            TeamMemberModel.id.label("member_id"),
+            TeamMemberModel.user_id,
+            TeamMemberModel.role,
+            member_skills.label("skill_ids"),
+        )
+        .join(TeamMemberModel, TeamMemberModel.team_id == TeamModel.id)
+        .where(TeamModel.hackathon_id == hack_id)
+        .order_by(TeamModel.id, TeamMemberModel.id)
+    )
+    return {
+        "participants": [row._asdict() for row in participants.all()],
+        "slots": [row._asdict() for row in slots.all()],
+    }
+
+
 async def get_participants_by_hack_id(
     session: AsyncSession, hack_id: int
 ) -> list[ParticipantsModel]:
     result = await session.execute(
-        select(ParticipantsModel).where(ParticipantsModel.hackathon_id == hack_id)
+        select(ParticipantsModel)
+        .options(*PARTICIPANT_CARD)
+        .where(ParticipantsModel.hackathon_id == hack_id)
+    )
+    return result.scalars().all()
+
+
+async def get_participant_directory(
+    session: AsyncSession,
+    hack_id: int,
+    team_status: str | None = None,
+    after_user_id: int | None = None,
+    limit: int | None = None,
+) -> list[dict]:
+    # участник хакатона: зарегистрирован через participants или уже состоит в его команде
+    membership = (
+        select(
+            TeamMemberModel.user_id.label("user_id"),
+            TeamModel.name.label("team_name"),
+            TeamMemberModel.role.label("team_role"),
+        )
+        .join(TeamModel, TeamMemberModel.team_id == TeamModel.id)
+        .where(TeamModel.hackathon_id == hack_id, TeamMemberModel.user_id.is_not(None))
+        .distinct(TeamMemberModel.user_id)
+        .order_by(TeamMemberModel.user_id, TeamMemberModel.id)
+        .subquery()
+    )
+    registered = (
+        select(ProfileModel.user_id.label("user_id"))
+        .join(ParticipantsModel, ParticipantsModel.profile_id == ProfileModel.id)
+        .where(ParticipantsModel.hackathon_id == hack_id)
+    )
+    hack_users = union(registered, select(membership.c.user_id)).subquery()
+
+    skills = (
+        select(func.array_agg(aggregate_order_by(SkillModel.name, SkillModel.id)))
+        .join(ProfileSkillModel, ProfileSkillModel.skill_id == SkillModel.id)
+        .join(ProfileModel, ProfileSkillModel.profile_id == ProfileModel.id)
+        .where(ProfileModel.user_id == UserModel.id)
+        .correlate(UserModel)
+        .scalar_subquery()
+    )
+
+    q = (
+        select(
+            UserModel.id,
+            UserModel.name,
+            UserModel.avatar_url,
+            membership.c.user_id.label("member_user_id"),
+            membership.c.team_name,
+            membership.c.team_role,
+            skills.label("skills"),
+        )
+        .join(hack_users, hack_users.c.user_id == UserModel.id)
+        .outerjoin(membership, membership.c.user_id == UserModel.id)
+        .order_by(UserModel.id)
+    )
+    if team_status == "with_team":
+        q = q.where(membership.c.user_id.is_not(None))
+    elif team_status == "without_team":
+        q = q.where(membership.c.user_id.is_(None))
+    if after_user_id is not None:
+        q = q.where(UserModel.id > after_user_id)
+    if limit is not None:
+        q = q.limit(limit)
+
+    result = await session.execute(q)
+    participants = []
+    for row in result.all():
+        has_team = row.member_user_id is not None
+        role = None
+        if has_team:
+            role = row.team_role.value if hasattr(row.team_role, "value") else str(row.team_role)
+        participants.append(
+            {
+                "user_id": row.id,
+                "name": row.name,
+                "avatar_url": row.avatar_url,
+                "has_team": has_team,
+                "team_name": row.team_name,
+                "role": role,
+                "skills": row.skills or [],
+            }
+        )
+    return participants
+
+
+async def create_job(
+    session: AsyncSession, kind: str, organizer_id: int, hackathon_id: int, params: dict
+) -> JobModel:
+    now = datetime.now(UTC)
+    job = JobModel(
+        kind=kind,
+        status=JobStatusEnum.PENDING,
+        organizer_id=organizer_id,
+        hackathon_id=hackathon_id,
+        params=params,
+        progress=0,
+        created_at=now,
+        updated_at=now,
+    )
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    return job
+
+
+async def get_job_by_id(session: AsyncSession, job_id: int) -> JobModel | None:
+    result = await session.execute(select(JobModel).where(JobModel.id == job_id))
+    return result.scalar_one_or_none()
+
+
+async def claim_next_job(session: AsyncSession, kinds: list[str]) -> JobModel | None:
+    """Забирает самую старую PENDING-задачу; SKIP LOCKED не даёт двум воркерам взять одну."""
+    result = await session.execute(
+        select(JobModel)
+        .where(JobModel.status == JobStatusEnum.PENDING, JobModel.kind.in_(kinds))
+        .order_by(JobModel.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = result.scalar_one_or_none()
+    if job is None:
+        return None
+
+    job.status = JobStatusEnum.RUNNING
+    job.attempts += 1
+    job.updated_at = datetime.now(UTC)
+    await session.commit()
+    return job
+
+
+async def update_job_progress(
+    session: AsyncSession, job_id: int, progress: int, total: int | None = None
+) -> None:
+    values = {"progress": progress, "updated_at": datetime.now(UTC)}
+    if total is not None:
+        values["total"] = total
+    await session.execute(update(JobModel).where(JobModel.id == job_id).values(**values))
+    await session.commit()
+
+
+async def finish_job(
+    session: AsyncSession,
+    job_id: int,
+    result_path: str | None = None,
+    error: str | None = None,
+    progress: int | None = None,
+    total: int | None = None,
+) -> None:
+    now = datetime.now(UTC)
+    values = {
+        "status": JobStatusEnum.FAILED if error is not None else JobStatusEnum.DONE,
+        "result_path": result_path,
+        "error": error,
+        "updated_at": now,
+        "finished_at": now,
+    }
+    # итоговый прогресс: промежуточные значения пишутся с прореживанием
+    if progress is not None:
+        values["progress"] = progress
+    if total is not None:
+        values["total"] = total
+    await session.execute(update(JobModel).where(JobModel.id == job_id).values(**values))
+    await session.commit()
+
+
+async def requeue_stale_jobs(
+    session: AsyncSession, stale_seconds: float, max_attempts: int
+) -> tuple[int, int]:
+    """Возвращает в очередь задачи, воркер которых перестал обновлять прогресс.
+
+    Задача, исчерпавшая max_attempts, скорее всего сама роняет воркер: она
+    помечается failed, а не берётся снова. Возвращает (в очереди, failed).
+    """
+    now = datetime.now(UTC)
+    stale = (
+        JobModel.status == JobStatusEnum.RUNNING,
+        JobModel.updated_at < now - timedelta(seconds=stale_seconds),
+    )
+    failed = await session.execute(
+        update(JobModel)
+        .where(*stale, JobModel.attempts >= max_attempts)
+        .values(
+            status=JobStatusEnum.FAILED,
+            error=f"Воркер задачи перестал отвечать {max_attempts} раз подряд",
+            updated_at=now,
+            finished_at=now,
+        )
+    )
+    requeued = await session.execute(
+        update(JobModel)
+        .where(*stale, JobModel.attempts < max_attempts)
+        .values(status=JobStatusEnum.PENDING, progress=0, updated_at=now)
+    )
+    await session.commit()
+    return requeued.rowcount, failed.rowcount
+
+
+async def expire_job_results(session: AsyncSession, finished_before: datetime) -> list[str]:
+    """Забывает файлы результатов старых задач; возвращает пути, которые нужно удалить."""
+    # RETURNING отдаёт значения после UPDATE, поэтому старый путь берём из подзапроса
+    expired = (
+        select(JobModel.id, JobModel.result_path)
+        .where(
+            JobModel.status == JobStatusEnum.DONE,
+            JobModel.result_path.is_not(None),
+            JobModel.finished_at < finished_before,
+        )
+        .with_for_update(skip_locked=True)
+        .subquery()
+    )
+    result = await session.execute(
+        update(JobModel)
+        .where(JobModel.id == expired.c.id)
+        .values(result_path=None)
+        .returning(expired.c.result_path)
+    )
+    paths = result.scalars().all()
+    await session.commit()
+    return paths
+
+
+async def revoke_tokens(session: AsyncSession, entries: dict[str, datetime]) -> list[str]:
+    """Отзывает токены до их истечения; возвращает id, которых ещё не было в списке."""
+    if not entries:
+        return []
+    result = await session.execute(
+        pg_insert(RevokedTokenModel)
+        .values(
+            [
+                {"token_id": token_id, "expires_at": expires_at}
+                for token_id, expires_at in entries.items()
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=[RevokedTokenModel.token_id])
+        .returning(RevokedTokenModel.token_id)
+    )
+    inserted = result.scalars().all()
+    await session.commit()
+    return inserted
+
+
+async def get_revoked_token_ids(
+    session: AsyncSession, token_ids: list[str] | None = None
+) -> list[str]:
+    # без token_ids — все действующие записи (для загрузки фильтра при старте)
+    q = select(RevokedTokenModel.token_id).where(
+        RevokedTokenModel.expires_at > datetime.now(UTC)
     )
+    if token_ids is not None:
+        q = q.where(RevokedTokenModel.token_id.in_(token_ids))
+    result = await session.execute(q)
     return result.scalars().all()
+
+
+async def purge_revoked_tokens(session: AsyncSession) -> int:
+    result = await session.execute(
+        delete(RevokedTokenModel).where(RevokedTokenModel.expires_at <= datetime.now(UTC))
+    )
+    await session.commit()
+    return result.rowcount
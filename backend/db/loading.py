@@ -0,0 +1,27 @@
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from db.models import (
+    ParticipantsModel,
+    ProfileModel,
+    ProfileSkillModel,
+    TeamMemberModel,
+    TeamModel,
+)
+
+# Именованные профили загрузки связей для запросов в crud.
+# По умолчанию связи моделей не грузятся (lazy="raise"), поэтому каждый запрос
+# явно указывает, какие связи ему нужны.
+
+# только колонки хакатона, без команд, участников и организатора
+HACK_SUMMARY = (raiseload("*"),)
+
+# команда с участниками и их пользователями
+TEAM_ROSTER = (selectinload(TeamModel.team_members).joinedload(TeamMemberModel.user),)
+
+# участник с профилем, пользователем и навыками
+PARTICIPANT_CARD = (
+    joinedload(ParticipantsModel.profile).joinedload(ProfileModel.user),
+    joinedload(ParticipantsModel.profile)
+    .selectinload(ProfileModel.profile_skills)
+    .joinedload(ProfileSkillModel.skill),
+)
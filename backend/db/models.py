@@ -1,6 +1,20 @@
 from enum import Enum as PyEnum
 
-from sqlalchemy import BigInteger, Boolean, Date, Enum as PQEnum, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Computed,
+    Date,
+    DateTime,
+    Enum as PQEnum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -8,6 +22,10 @@ class Base(DeclarativeBase):
     pass
 
 
+# Все связи объявлены с lazy="raise": неявная догрузка запрещена,
+# нужные связи подгружаются явно профилями из db.loading.
+
+
 class UserModel(Base):
     __tablename__ = "users"
 
@@ -18,10 +36,10 @@ class UserModel(Base):
     avatar_url: Mapped[str] = mapped_column(Text)
 
     profiles: Mapped[list["ProfileModel"]] = relationship(
-        "ProfileModel", back_populates="user", lazy="selectin"
+        "ProfileModel", back_populates="user", lazy="raise"
     )
     team_members: Mapped[list["TeamMemberModel"]] = relationship(
-        "TeamMemberModel", back_populates="user", lazy="noload"
+        "TeamMemberModel", back_populates="user", lazy="raise"
     )
 
 
@@ -45,12 +63,12 @@ class ProfileModel(Base):
     )
     about: Mapped[str] = mapped_column(String(512))
 
-    user: Mapped["UserModel"] = relationship("UserModel", back_populates="profiles", lazy="joined")
+    user: Mapped["UserModel"] = relationship("UserModel", back_populates="profiles", lazy="raise")
     profile_skills: Mapped[list["ProfileSkillModel"]] = relationship(
-        "ProfileSkillModel", back_populates="profile", lazy="selectin"
+        "ProfileSkillModel", back_populates="profile", lazy="raise"
     )
     participants: Mapped[list["ParticipantsModel"]] = relationship(
-        "ParticipantsModel", back_populates="profile", lazy="selectin"
+        "ParticipantsModel", back_populates="profile", lazy="raise"
     )
 
 
@@ -61,10 +79,10 @@ class ProfileSkillModel(Base):
     skill_id: Mapped[int] = mapped_column(ForeignKey("skills.id"), primary_key=True, index=True)
 
     profile: Mapped["ProfileModel"] = relationship(
-        "ProfileModel", back_populates="profile_skills", lazy="joined"
+        "ProfileModel", back_populates="profile_skills", lazy="raise"
     )
     skill: Mapped["SkillModel"] = relationship(
-        "SkillModel", back_populates="profile_skills", lazy="joined"
+        "SkillModel", back_populates="profile_skills", lazy="raise"
     )
 
 
@@ -84,7 +102,7 @@ class SkillModel(Base):
     )
 
     profile_skills: Mapped[list["ProfileSkillModel"]] = relationship(
-        "ProfileSkillModel", back_populates="skill", lazy="noload"
+        "ProfileSkillModel", back_populates="skill", lazy="raise"
     )
 
 
@@ -96,12 +114,18 @@ class OrganizerModel(Base):
     password_hash: Mapped[str] = mapped_column(String(128))
 
     hackathons: Mapped[list["HackathonModel"]] = relationship(
-        "HackathonModel", back_populates="organizer", lazy="selectin"
+        "HackathonModel", back_populates="organizer", lazy="raise"
     )
 
 
 class HackathonModel(Base):
     __tablename__ = "hackathons"
+    # порядок постраничной выдачи /api/hacks/all (keyset по start_date, id)
+    __table_args__ = (
+        Index("ix_hackathons_start_date_id", "start_date", "id"),
+        Index("ix_hackathons_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_hackathons_tag_list", "tag_list", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255), index=True)
@@ -113,6 +137,26 @@ class HackathonModel(Base):
 
     tags: Mapped[str] = mapped_column(Text)
 
+    # поисковые колонки вычисляет Postgres; deferred — чтобы не тянуть их в обычные выборки
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+    tag_list: Mapped[list[str]] = mapped_column(
+        ARRAY(Text),
+        Computed(
+            r"array_remove(regexp_split_to_array(lower(btrim(coalesce(tags, ''))), "
+            r"'\s*,\s*'), '')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
     max_teams: Mapped[int] = mapped_column(Integer)
     min_team_size: Mapped[int] = mapped_column(Integer)
     max_team_size: Mapped[int] = mapped_column(Integer)
@@ -120,13 +164,14 @@ class HackathonModel(Base):
     organizer_id: Mapped[int] = mapped_column(ForeignKey("organizers.id"), index=True)
 
     organizer: Mapped["OrganizerModel"] = relationship(
-        "OrganizerModel", back_populates="hackathons", lazy="joined"
+        "OrganizerModel", back_populates="hackathons", lazy="raise"
     )
+    # passive_deletes: удаление хакатона не должно догружать коллекции
     teams: Mapped[list["TeamModel"]] = relationship(
-        "TeamModel", back_populates="hackathon", lazy="selectin"
+        "TeamModel", back_populates="hackathon", lazy="raise", passive_deletes=True
     )
     participants: Mapped[list["ParticipantsModel"]] = relationship(
-        "ParticipantsModel", back_populates="hackathon", lazy="selectin"
+        "ParticipantsModel", back_populates="hackathon", lazy="raise", passive_deletes=True
     )
 
 
@@ -141,13 +186,13 @@ class TeamModel(Base):
     # по-хорошему сюда надо наебашить approved, чтобы организатор мог принимать или нет команды
 
     hackathon: Mapped["HackathonModel"] = relationship(
-        "HackathonModel", back_populates="teams", lazy="joined"
+        "HackathonModel", back_populates="teams", lazy="raise"
     )
     team_members: Mapped[list["TeamMemberModel"]] = relationship(
-        "TeamMemberModel", back_populates="team", lazy="selectin"
+        "TeamMemberModel", back_populates="team", lazy="raise"
     )
     invites: Mapped[list["InviteModel"]] = relationship(
-        "InviteModel", back_populates="team", lazy="selectin"
+        "InviteModel", back_populates="team", lazy="raise"
     )
 
 
@@ -163,10 +208,10 @@ class TeamMemberModel(Base):
     )
 
     team: Mapped["TeamModel"] = relationship(
-        "TeamModel", back_populates="team_members", lazy="joined"
+        "TeamModel", back_populates="team_members", lazy="raise"
     )
     user: Mapped["UserModel"] = relationship(
-        "UserModel", back_populates="team_members", lazy="joined"
+        "UserModel", back_populates="team_members", lazy="raise"
     )
 
 
@@ -178,13 +223,13 @@ class ParticipantsModel(Base):
     profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), index=True)
 
     hackathon: Mapped["HackathonModel"] = relationship(
-        "HackathonModel", back_populates="participants", lazy="joined"
+        "HackathonModel", back_populates="participants", lazy="raise"
     )
     profile: Mapped["ProfileModel"] = relationship(
-        "ProfileModel", back_populates="participants", lazy="joined"
+        "ProfileModel", back_populates="participants", lazy="raise"
     )
     invites: Mapped[list["InviteModel"]] = relationship(
-        "InviteModel", back_populates="participant", lazy="selectin"
+        "InviteModel", back_populates="participant", lazy="raise"
     )
 
 
@@ -213,7 +258,97 @@ class InviteModel(Base):
         nullable=False,
     )
 
-    team: Mapped["TeamModel"] = relationship("TeamModel", back_populates="invites", lazy="joined")
+    team: Mapped["TeamModel"] = relationship("TeamModel", back_populates="invites", lazy="raise")
     participant: Mapped["ParticipantsModel"] = relationship(
-        "ParticipantsModel", back_populates="invites", lazy="joined"
+        "ParticipantsModel", back_populates="invites", lazy="raise"
     )
+
+
+class HackathonStatsModel(Base):
+    """Счётчики аналитики, обновляемые в тех же транзакциях, что и команды.
+
+    role_counts — число занятых мест по ролям (ключ "None" у создателей команд без роли).
+    """
+
+    __tablename__ = "hackathon_stats"
+
+    hackathon_id: Mapped[int] = mapped_column(
+        ForeignKey("hackathons.id", ondelete="CASCADE"), primary_key=True
+    )
+    total_teams: Mapped[int] = mapped_column(Integer, default=0)
+    incomplete_teams: Mapped[int] = mapped_column(Integer, default=0)
+    total_participants: Mapped[int] = mapped_column(Integer, default=0)
+    role_counts: Mapped[dict] = mapped_column(JSONB, default=dict)
+    updated_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True))
+
+
+class HackathonStatsHistoryModel(Base):
+    """Снимки hackathon_stats во времени (старые точки прореживаются).
+
+    resolution — шаг точки: minute, hour или day.
+    """
+
+    __tablename__ = "hackathon_stats_history"
+    __table_args__ = (
+        # одна точка на интервал: повторные снимки и прореживание делают upsert
+        UniqueConstraint(
+            "hackathon_id",
+            "resolution",
+            "recorded_at",
+            name="uq_hackathon_stats_history_point",
+        ),
+        # выборка истории идёт по хакатону и отрезку времени
+        Index("ix_hackathon_stats_history_hackathon_recorded", "hackathon_id", "recorded_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger(), primary_key=True)
+    hackathon_id: Mapped[int] = mapped_column(ForeignKey("hackathons.id", ondelete="CASCADE"))
+    recorded_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True))
+    resolution: Mapped[str] = mapped_column(String(8))
+    total_teams: Mapped[int] = mapped_column(Integer)
+    incomplete_teams: Mapped[int] = mapped_column(Integer)
+    total_participants: Mapped[int] = mapped_column(Integer)
+
+
+class JobStatusEnum(PyEnum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class JobModel(Base):
+    __tablename__ = "jobs"
+    # очередь выбирает самую старую PENDING-задачу
+    __table_args__ = (Index("ix_jobs_status_id", "status", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(32))
+    status: Mapped[JobStatusEnum] = mapped_column(
+        PQEnum(JobStatusEnum, create_type=True), nullable=False
+    )
+    organizer_id: Mapped[int] = mapped_column(ForeignKey("organizers.id"), index=True)
+    hackathon_id: Mapped[int] = mapped_column(
+        ForeignKey("hackathons.id", ondelete="CASCADE"), index=True
+    )
+    params: Mapped[dict] = mapped_column(JSONB, default=dict)
+
+    progress: Mapped[int] = mapped_column(Integer, default=0)
+    total: Mapped[int] = mapped_column(Integer, nullable=True)
+    # сколько раз задачу забирал воркер (повторы после падений)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    result_path: Mapped[str] = mapped_column(Text, nullable=True)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class RevokedTokenModel(Base):
+    __tablename__ = "revoked_tokens"
+
+    # jti токена или "fam:<id>" для всей цепочки refresh-токенов
+    token_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # после истечения самого токена запись не нужна и удаляется
+    expires_at: Mapped["DateTime"] = mapped_column(DateTime(timezone=True), index=True)
@@ -1,15 +1,118 @@
-from sqlalchemy.engine.url import URL
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event, text
+from sqlalchemy.engine.url import URL, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from metrics import counter, gauge, histogram
+
+POOL_CHECKOUT_WAIT = histogram(
+    "db_pool_checkout_wait_seconds", "Ожидание соединения из пула", ("pool",)
+)
+POOL_CHECKOUT_TIMEOUTS = counter(
+    "db_pool_checkout_timeouts", "Таймауты ожидания соединения из пула", ("pool",)
+)
+POOL_CHECKED_OUT = gauge("db_pool_checked_out", "Выданные из пула соединения", ("pool",))
+POOL_SATURATION = gauge(
+    "db_pool_saturation", "Доля занятых соединений от pool_size + max_overflow", ("pool",)
+)
+POOL_SIZE = gauge("db_pool_size", "Постоянные соединения пула", ("pool",))
+POOL_OVERFLOW = gauge("db_pool_overflow", "Соединения сверх pool_size", ("pool",))
+QUERY_SECONDS = histogram("db_query_duration_seconds", "Время выполнения SQL-запросов", ("pool",))
+REPLICA_FALLBACKS = counter(
+    "db_replica_fallbacks", "Чтения, отправленные на primary из-за отставания реплики"
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Число и суммарное время SQL-запросов в рамках одной операции (HTTP-запроса)."""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# выставляется тем, кто хочет считать свои запросы (middleware); None — не считать
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _instrument_queries(engine: AsyncEngine, label: str) -> None:
+    # события синхронного движка вызываются в гринлете с контекстом вызывающей задачи,
+    # поэтому query_stats здесь тот же, что и в обработчике запроса
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record_query(conn)
+
+    def handle_error(exception_context):
+        if exception_context.connection is not None:
+            record_query(exception_context.connection)
+
+    def record_query(conn) -> None:
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        QUERY_SECONDS.observe(elapsed, pool=label)
+        stats = query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", handle_error)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул, замеряющий время ожидания свободного соединения."""
+
+    metrics_label = "primary"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc(pool=self.metrics_label)
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start, pool=self.metrics_label)
 
 
 class Database:
     def __init__(
-        self, username: str, password: str, host: str, port: int, database: str
+        self,
+        username: str,
+        password: str,
+        host: str,
+        port: int,
+        database: str,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30,
+        pool_recycle: int = 1800,
+        pool_pre_ping: bool = True,
+        statement_cache_size: int = 100,
+        statement_timeout_ms: int = 0,
+        replica_dsn: str | None = None,
+        replica_max_lag_seconds: float = 5,
+        replica_lag_check_interval: float = 1,
     ):
         self.url = URL.create(
             drivername="postgresql+asyncpg",
@@ -19,18 +122,154 @@ class Database:
             port=port,
             database=database,
         )
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self.statement_cache_size = statement_cache_size
+        self.statement_timeout_ms = statement_timeout_ms
+
+        self.replica_url: URL | None = None
+        if replica_dsn:
+            self.replica_url = make_url(replica_dsn).set(drivername="postgresql+asyncpg")
+        self.replica_max_lag_seconds = replica_max_lag_seconds
+        self.replica_lag_check_interval = replica_lag_check_interval
+
         self.engine: AsyncEngine | None = None
         self.session: async_sessionmaker[AsyncSession] | None = None
+        self.replica_engine: AsyncEngine | None = None
+        self.replica_session: async_sessionmaker[AsyncSession] | None = None
 
-    async def connect(self) -> None:
-        self.engine: AsyncEngine = create_async_engine(
-            self.url,
+        self._replica_lag: float | None = None
+        self._replica_lag_checked_at = 0.0
+        self._replica_lag_lock = asyncio.Lock()
+
+        # движок один на процесс: его делят FastAPI и aiogram-диспетчер
+        self._lock = asyncio.Lock()
+        self._users = 0
+
+    def _connect_args(self) -> dict:
+        server_settings = {}
+        if self.statement_timeout_ms:
+            server_settings["statement_timeout"] = str(self.statement_timeout_ms)
+        return {
+            # кэш подготовленных выражений asyncpg и SQLAlchemy-адаптера
+            # (0 отключает оба, нужно за pgbouncer в режиме transaction)
+            "statement_cache_size": self.statement_cache_size,
+            "prepared_statement_cache_size": self.statement_cache_size,
+            "server_settings": server_settings,
+        }
+
+    def _create_engine(self, url: URL, label: str) -> AsyncEngine:
+        engine = create_async_engine(
+            url,
             echo=False,
+            poolclass=InstrumentedPool,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+            pool_recycle=self.pool_recycle,
+            pool_pre_ping=self.pool_pre_ping,
+            connect_args=self._connect_args(),
         )
-        self.session: async_sessionmaker[AsyncSession] = async_sessionmaker(
-            bind=self.engine, class_=AsyncSession, expire_on_commit=False
-        )
+        pool = engine.pool
+        pool.metrics_label = label
+        capacity = max(self.pool_size + max(self.max_overflow, 0), 1)
+        POOL_CHECKED_OUT.set_function(pool.checkedout, pool=label)
+        POOL_SATURATION.set_function(lambda: pool.checkedout() / capacity, pool=label)
+        POOL_SIZE.set_function(pool.size, pool=label)
+        POOL_OVERFLOW.set_function(lambda: max(pool.overflow(), 0), pool=label)
+        _instrument_queries(engine, label)
+        return engine
+
+    async def connect(self) -> None:
+        async with self._lock:
+            self._users += 1
+            if self.engine is not None:
+                return
+
+            self.engine = self._create_engine(self.url, "primary")
+            self.session = async_sessionmaker(
+                bind=self.engine, class_=AsyncSession, expire_on_commit=False
+            )
+            if self.replica_url is not None:
+                self.replica_engine = self._create_engine(self.replica_url, "replica")
+                # метка в session.info: данные реплики могут отставать от primary
+                self.replica_session = async_sessionmaker(
+                    bind=self.replica_engine,
+                    class_=AsyncSession,
+                    expire_on_commit=False,
+                    info={"replica": True},
+                )
 
     async def disconnect(self) -> None:
-        if self.engine is not None:
+        async with self._lock:
+            self._users = max(self._users - 1, 0)
+            if self._users or self.engine is None:
+                return
+
             await self.engine.dispose()
+            self.engine = None
+            self.session = None
+            if self.replica_engine is not None:
+                await self.replica_engine.dispose()
+                self.replica_engine = None
+                self.replica_session = None
+
+    async def _check_replica_lag(self) -> float | None:
+        # отставание в секундах; 0, если реплика проиграла всё, что получила
+        query = text(
+            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+        )
+        try:
+            async with self.replica_engine.connect() as conn:
+                result = await conn.execute(query)
+                return float(result.scalar_one())
+        except Exception:
+            logger.warning("Replica lag check failed, falling back to primary", exc_info=True)
+            return None
+
+    async def replica_lag(self) -> float | None:
+        if self.replica_engine is None:
+            return None
+
+        now = time.monotonic()
+        stale = now - self._replica_lag_checked_at >= self.replica_lag_check_interval
+        # проверку выполняет один запрос, остальные берут последнее известное значение
+        if stale and not self._replica_lag_lock.locked():
+            async with self._replica_lag_lock:
+                self._replica_lag = await self._check_replica_lag()
+                self._replica_lag_checked_at = time.monotonic()
+        return self._replica_lag
+
+    async def read_sessionmaker(self) -> async_sessionmaker[AsyncSession]:
+        """Сессии для read-only запросов: реплика, если она есть и не отстаёт."""
+        if self.replica_session is None:
+            return self.session
+
+        lag = await self.replica_lag()
+        if lag is None or lag > self.replica_max_lag_seconds:
+            REPLICA_FALLBACKS.inc()
+            return self.session
+        return self.replica_session
+
+    def pool_stats(self) -> dict:
+        stats = {}
+        for label, engine in (("primary", self.engine), ("replica", self.replica_engine)):
+            if engine is None:
+                continue
+
+            pool = engine.pool
+            stats[label] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "saturation": round(POOL_SATURATION.value(pool=label), 4),
+                "checkout_wait": POOL_CHECKOUT_WAIT.stats(pool=label),
+                "checkout_timeouts": POOL_CHECKOUT_TIMEOUTS.value(pool=label),
+            }
+        if self.replica_engine is not None:
+            stats["replica"]["lag_seconds"] = self._replica_lag
+        return stats
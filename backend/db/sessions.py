@@ -0,0 +1,63 @@
+from sqlalchemy.exc import SQLAlchemyError
+
+from config import (
+    DB_HOST,
+    DB_MAX_OVERFLOW,
+    DB_NAME,
+    DB_PASSWORD,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_PORT,
+    DB_REPLICA_DSN,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_STATEMENT_TIMEOUT_MS,
+    DB_USERNAME,
+)
+
+from .postgre import Database
+
+db = Database(
+    username=DB_USERNAME,
+    password=DB_PASSWORD,
+    host=DB_HOST,
+    port=DB_PORT,
+    database=DB_NAME,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+    statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS,
+    replica_dsn=DB_REPLICA_DSN or None,
+    replica_max_lag_seconds=DB_REPLICA_MAX_LAG_SECONDS,
+)
+
+
+# зависимости FastAPI: генератор закрывает сам FastAPI, так что выход из async with
+# выполняется и при обрыве запроса
+async def get_session():
+    async with db.session() as session:
+        try:
+            yield session  # ruff: ignore[yield-in-context-manager-in-async-generator]
+        except SQLAlchemyError:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+
+async def get_read_session():
+    # только для чтения: реплика, а при её отставании — primary
+    sessionmaker = await db.read_sessionmaker()
+    async with sessionmaker() as session:
+        try:
+            yield session  # ruff: ignore[yield-in-context-manager-in-async-generator]
+        except SQLAlchemyError:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
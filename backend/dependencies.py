@@ -1,24 +1,41 @@
 # dependencies.py
-import hashlib
-import os
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Annotated
 
 import jwt
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import APIKeyCookie, HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config import SECRET_KEY
-from db import get_session
-from db.models import OrganizerModel
+from config import (
+    PASSWORD_HASH_ITERATIONS,
+    PASSWORD_HASH_QUEUE,
+    PASSWORD_HASH_WORKERS,
+    SECRET_KEY,
+)
+from db import get_read_session, get_session
+from db.crud import get_organizer_login
+from passwords import HasherBusyError, PasswordHasher
+from tokens import is_token_revoked, token_claims
+from utils import get_current_user_id
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-HASH_NAME = "sha256"
-SALT_SIZE = 16
-ITERATIONS = 100_000
+# PBKDF2 считается в пуле потоков, см. passwords.PasswordHasher
+password_hasher = PasswordHasher(
+    iterations=PASSWORD_HASH_ITERATIONS,
+    workers=PASSWORD_HASH_WORKERS,
+    max_queue=PASSWORD_HASH_QUEUE,
+)
+
+# сессии для параметров обработчиков: Depends через Annotated
+DbSession = Annotated[AsyncSession, Depends(get_session)]
+# только для чтения: реплика, а при её отставании — primary
+ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+# id участника из cookie access_token
+CurrentUserId = Annotated[int, Depends(get_current_user_id)]
 
 # Для Bearer токенов (если нужны)
 security = HTTPBearer()
@@ -27,24 +44,54 @@ security = HTTPBearer()
 cookie_scheme = APIKeyCookie(name="access_token", auto_error=False)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
-        salt, hash_val = hashed_password.split(":")
-        salt = bytes.fromhex(salt)
-        hash_check = hashlib.pbkdf2_hmac(HASH_NAME, plain_password.encode(), salt, ITERATIONS)
-        return hash_val == hash_check.hex()
-    except Exception:
-        return False
+        return await password_hasher.verify(plain_password, hashed_password)
+    except HasherBusyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервер перегружен, попробуйте войти позже",
+        ) from exc
+
 
+async def get_password_hash(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except HasherBusyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервер перегружен, попробуйте позже",
+        ) from exc
 
-def get_password_hash(password: str) -> str:
-    salt = os.urandom(SALT_SIZE)
-    hash_val = hashlib.pbkdf2_hmac(HASH_NAME, password.encode(), salt, ITERATIONS)
-    return f"{salt.hex()}:{hash_val.hex()}"
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    # хэш старого формата или с другим числом итераций пересчитывается при входе
+    return password_hasher.needs_rehash(hashed_password)
+
+
+@dataclass(frozen=True)
+class OrganizerPrincipal:
+    """Организатор из токена: id из JWT, login из кэша проверки существования.
+
+    Проверки прав (hackathon.organizer_id != current_organizer.id) работают с ним
+    так же, как с OrganizerModel, но без запроса к БД на каждый вызов.
+    """
 
-def create_access_token(data: dict) -> str:
-    to_encode = data.copy()
+    id: int
+    login: str
+
+
+async def get_organizer_principal(
+    session: AsyncSession, organizer_id: int
+) -> OrganizerPrincipal | None:
+    login = await get_organizer_login(session, organizer_id)
+    if login is None:
+        return None
+    return OrganizerPrincipal(id=organizer_id, login=login)
+
+
+def create_access_token(data: dict, family: str | None = None) -> str:
+    to_encode = {**data, **token_claims(family)}
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
@@ -53,7 +100,7 @@ def create_access_token(data: dict) -> str:
 
 async def get_current_organizer_cookie(
     request: Request, session: AsyncSession = Depends(get_session)
-) -> OrganizerModel:
+) -> OrganizerPrincipal:
     """
     Получает организатора из куки access_token.
     Также поддерживает Bearer токен в заголовке для совместимости.
@@ -79,20 +126,25 @@ async def get_current_organizer_cookie(
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         organizer_id = payload.get("sub")
 
-        if organizer_id is None:
+        # токены участников подписаны тем же ключом, но роли organizer у них нет;
+        # refresh-токен годится только для /organizer/refresh
+        if (
+            organizer_id is None
+            or payload.get("role") != "organizer"
+            or payload.get("type") == "refresh"
+        ):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Неверные учетные данные"
             )
-    except jwt.PyJWTError:
+    except jwt.PyJWTError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Неверный или просроченный токен"
-        )
+        ) from exc
 
-    result = await session.execute(
-        select(OrganizerModel).where(OrganizerModel.id == int(organizer_id))
-    )
-    organizer = result.scalar_one_or_none()
+    if await is_token_revoked(payload):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Токен отозван")
 
+    organizer = await get_organizer_principal(session, int(organizer_id))
     if organizer is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Организатор не найден"
@@ -104,7 +156,7 @@ async def get_current_organizer_cookie(
 async def get_current_organizer_bearer(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     session: AsyncSession = Depends(get_session),
-) -> OrganizerModel:
+) -> OrganizerPrincipal:
     """
     Альтернативная зависимость для Bearer токенов (для Swagger тестирования)
     """
@@ -114,26 +166,33 @@ async def get_current_organizer_bearer(
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         organizer_id = payload.get("sub")
 
-        if organizer_id is None:
+        if (
+            organizer_id is None
+            or payload.get("role") != "organizer"
+            or payload.get("type") == "refresh"
+        ):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
             )
-    except jwt.PyJWTError:
+    except jwt.PyJWTError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials"
-        )
+        ) from exc
 
-    result = await session.execute(
-        select(OrganizerModel).where(OrganizerModel.id == int(organizer_id))
-    )
-    organizer = result.scalar_one_or_none()
+    if await is_token_revoked(payload):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
 
+    organizer = await get_organizer_principal(session, int(organizer_id))
     if organizer is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Organizer not found")
 
     return organizer
 
 
+# организатор из куки или Bearer-токена
+CurrentOrganizer = Annotated[OrganizerPrincipal, Depends(get_current_organizer_cookie)]
+
+
 def create_error_response(status_code: int, detail: str) -> dict:
     return {"detail": detail, "status_code": status_code}
@@ -0,0 +1,4 @@
+from .runner import JobHandler, JobRunner, Progress, runner
+from .scheduler import Scheduler, scheduler
+
+__all__ = ["JobHandler", "JobRunner", "Progress", "Scheduler", "runner", "scheduler"]
@@ -0,0 +1,81 @@
+import asyncio
+import os
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import (
+    JOBS_CLEANUP_INTERVAL,
+    JOBS_RESULT_TTL_HOURS,
+    REVOCATION_SYNC_INTERVAL,
+    STATS_HOUR_RETENTION_DAYS,
+    STATS_MINUTE_RETENTION_HOURS,
+    STATS_RECONCILE_INTERVAL,
+    STATS_SNAPSHOT_INTERVAL,
+)
+from db import db
+from db.crud import (
+    downsample_hackathon_stats,
+    expire_job_results,
+    reconcile_hackathon_stats,
+    snapshot_hackathon_stats,
+)
+from revocation import revocations
+
+from . import runner, scheduler
+
+# ключ advisory-lock: сверку в каждый момент выполняет только один воркер
+RECONCILE_STATS_LOCK = 0x5747_0001
+SNAPSHOT_STATS_LOCK = 0x5747_0002
+
+
+async def try_lock(session: AsyncSession, key: int) -> bool:
+    return await session.scalar(select(func.pg_try_advisory_xact_lock(key)))
+
+
+async def remove_result(path: str) -> None:
+    with suppress(FileNotFoundError):
+        await asyncio.to_thread(os.remove, path)
+
+
+@scheduler.every(STATS_RECONCILE_INTERVAL)
+async def reconcile_stats() -> None:
+    async with db.session() as session:
+        if await try_lock(session, RECONCILE_STATS_LOCK):
+            await reconcile_hackathon_stats(session)
+        await session.commit()
+
+
+@scheduler.every(STATS_SNAPSHOT_INTERVAL)
+async def snapshot_stats() -> None:
+    async with db.session() as session:
+        if await try_lock(session, SNAPSHOT_STATS_LOCK):
+            await snapshot_hackathon_stats(session)
+            await downsample_hackathon_stats(
+                session, "minute", "hour", timedelta(hours=STATS_MINUTE_RETENTION_HOURS)
+            )
+            await downsample_hackathon_stats(
+                session, "hour", "day", timedelta(days=STATS_HOUR_RETENTION_DAYS)
+            )
+        await session.commit()
+
+
+@scheduler.every(REVOCATION_SYNC_INTERVAL)
+async def sync_revocations() -> None:
+    # истёкшие отзывы удаляются, а фильтр догоняет пропущенные сообщения pub/sub;
+    # нужно каждому воркеру, в том числе с JOBS_ENABLED=False
+    await revocations.purge()
+    await revocations.load()
+
+
+@runner.every(JOBS_CLEANUP_INTERVAL)
+async def cleanup_job_results() -> None:
+    # файлы выгрузок лежат у процессов с очередью, поэтому и чистят их они;
+    # задачи остаются в истории без результата
+    finished_before = datetime.now(UTC) - timedelta(hours=JOBS_RESULT_TTL_HOURS)
+    async with db.session() as session:
+        paths = await expire_job_results(session, finished_before)
+    for path in paths:
+        await remove_result(path)
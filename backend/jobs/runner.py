@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+
+from config import (
+    JOBS_CONCURRENCY,
+    JOBS_MAX_ATTEMPTS,
+    JOBS_POLL_INTERVAL,
+    JOBS_STALE_SECONDS,
+)
+from db import db
+from db.crud import claim_next_job, finish_job, requeue_stale_jobs, update_job_progress
+from db.models import JobModel
+from metrics import counter, gauge
+
+from .scheduler import Periodic, Scheduler
+
+JOBS_FINISHED = counter("jobs_finished", "Завершённые фоновые задачи", ("kind", "status"))
+JOBS_RUNNING = gauge("jobs_running", "Выполняющиеся фоновые задачи", ("kind",))
+
+logger = logging.getLogger(__name__)
+
+Progress = Callable[[int, int | None], Awaitable[None]]
+JobHandler = Callable[[JobModel, Progress], Awaitable[str | None]]
+
+
+class JobRunner:
+    """Воркер очереди jobs внутри процесса API.
+
+    Задачи берутся из таблицы через FOR UPDATE SKIP LOCKED, поэтому несколько
+    процессов могут работать с одной очередью. Семафор ограничивает число
+    одновременно выполняемых задач, а значит и число занятых ими соединений.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 2,
+        poll_interval: float = 2,
+        stale_seconds: float = 600,
+        max_attempts: int = 3,
+        progress_interval: float = 1,
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+        self.progress_interval = progress_interval
+        self.handlers: dict[str, JobHandler] = {}
+
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # служебная работа очереди делит тот же лимит соединений, что и задачи
+        self._scheduler = Scheduler(self._semaphore)
+        self._wakeup = asyncio.Event()
+        self._loop_task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._requeued_at = 0.0
+
+    def register(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        def decorator(handler: JobHandler) -> JobHandler:
+            self.handlers[kind] = handler
+            return handler
+
+        return decorator
+
+    def every(self, seconds: float) -> Callable[[Periodic], Periodic]:
+        # работа, нужная только процессам с очередью (seconds <= 0 отключает)
+        return self._scheduler.every(seconds)
+
+    def notify(self) -> None:
+        # новая задача в этом процессе: не ждём следующего опроса
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._loop())
+            await self._scheduler.start()
+
+    async def stop(self) -> None:
+        await self._scheduler.stop()
+        tasks = [task for task in (self._loop_task, *self._tasks) if task is not None]
+        for task in tasks:
+            task.cancel()
+        # прерванные задачи останутся RUNNING и вернутся в очередь как зависшие
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await self._semaphore.acquire()
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("Failed to claim a job")
+                job = None
+
+            if job is None:
+                self._semaphore.release()
+                self._wakeup.clear()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                continue
+
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _claim(self) -> JobModel | None:
+        async with db.session() as session:
+            if time.monotonic() - self._requeued_at >= self.stale_seconds / 2:
+                self._requeued_at = time.monotonic()
+                requeued, failed = await requeue_stale_jobs(
+                    session, self.stale_seconds, self.max_attempts
+                )
+                if requeued or failed:
+                    logger.warning("Stale jobs: %s requeued, %s failed", requeued, failed)
+            return await claim_next_job(session, list(self.handlers))
+
+    async def _run(self, job: JobModel) -> None:
+        reported_at = 0.0
+        latest: dict = {"progress": 0, "total": None}
+
+        async def progress(done: int, total: int | None = None) -> None:
+            # прогресс пишется не чаще progress_interval и заодно служит heartbeat
+            nonlocal reported_at
+            latest.update(progress=done, total=total)
+            if time.monotonic() - reported_at < self.progress_interval:
+                return
+            reported_at = time.monotonic()
+            async with db.session() as session:
+                await update_job_progress(session, job.id, done, total)
+
+        JOBS_RUNNING.inc(kind=job.kind)
+        try:
+            result_path = await self.handlers[job.kind](job, progress)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            JOBS_FINISHED.inc(kind=job.kind, status="failed")
+            async with db.session() as session:
+                await finish_job(session, job.id, error=str(e) or type(e).__name__)
+        else:
+            JOBS_FINISHED.inc(kind=job.kind, status="done")
+            async with db.session() as session:
+                await finish_job(session, job.id, result_path=result_path, **latest)
+        finally:
+            JOBS_RUNNING.dec(kind=job.kind)
+            self._semaphore.release()
+
+
+runner = JobRunner(
+    concurrency=JOBS_CONCURRENCY,
+    poll_interval=JOBS_POLL_INTERVAL,
+    stale_seconds=JOBS_STALE_SECONDS,
+    max_attempts=JOBS_MAX_ATTEMPTS,
+)
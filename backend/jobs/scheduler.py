@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+Periodic = Callable[[], Awaitable[None]]
+
+
+class Scheduler:
+    """Периодическая служебная работа внутри процесса.
+
+    Задачи запускаются раз в заданный интервал. Если передан семафор, каждый
+    запуск занимает его, чтобы служебная работа делила лимит соединений с
+    очередью jobs.
+    """
+
+    def __init__(self, semaphore: asyncio.Semaphore | None = None):
+        self.periodic: list[tuple[float, Periodic]] = []
+        self._semaphore = semaphore
+        self._tasks: list[asyncio.Task] = []
+
+    def every(self, seconds: float) -> Callable[[Periodic], Periodic]:
+        # seconds <= 0 отключает задачу
+        def decorator(fn: Periodic) -> Periodic:
+            if seconds > 0:
+                self.periodic.append((seconds, fn))
+            return fn
+
+        return decorator
+
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._repeat(seconds, fn)) for seconds, fn in self.periodic
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, fn: Periodic) -> None:
+        try:
+            await fn()
+        except Exception:
+            logger.exception("Periodic job %s failed", fn.__name__)
+
+    async def _repeat(self, seconds: float, fn: Periodic) -> None:
+        while True:
+            await asyncio.sleep(seconds)
+            if self._semaphore is None:
+                await self._run(fn)
+                continue
+            async with self._semaphore:
+                await self._run(fn)
+
+
+# служебная работа всех процессов API, независимо от JOBS_ENABLED
+scheduler = Scheduler()
@@ -0,0 +1,14 @@
+from .assign import Assignment, solve_assignment, usable_slots
+from .index import ROLES, SkillIndex
+from .store import IndexStore, build_index, skill_indexes
+
+__all__ = [
+    "ROLES",
+    "Assignment",
+    "IndexStore",
+    "SkillIndex",
+    "build_index",
+    "skill_indexes",
+    "solve_assignment",
+    "usable_slots",
+]
@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from db.models import RoleType
+
+from .index import ROLES, SKILL_WEIGHT, SkillIndex
+
+# надбавка за место в команде, которой до min_team_size не хватает участников
+UNDERSTAFFED_BONUS = 0.5
+
+
+@dataclass(frozen=True)
+class Assignment:
+    participant_id: int
+    user_id: int
+    member_id: int
+    team_id: int
+    role: RoleType
+    score: float
+
+
+def usable_slots(index: SkillIndex, max_team_size: int, max_teams: int | None = None) -> np.ndarray:
+    """Номера свободных мест, которые можно заполнить, не превысив max_team_size.
+
+    Команды сверх max_teams (по порядку создания) не пополняются; если свободных
+    мест в команде больше, чем вмещает лимит, берутся первые по порядку.
+    """
+    capacity = np.maximum(max_team_size - index.team_sizes, 0)
+    if max_teams:
+        capacity[max_teams:] = 0
+    # места идут по командам подряд: порядковый номер места внутри своей команды
+    position = np.arange(len(index.slot_teams)) - np.searchsorted(
+        index.slot_teams, index.slot_teams
+    )
+    return np.flatnonzero(position < capacity[index.slot_teams])
+
+
+def solve_assignment(
+    index: SkillIndex, min_team_size: int, max_team_size: int, max_teams: int | None = None
+) -> list[Assignment]:
+    """Распределяет участников без команды по свободным местам.
+
+    Место занимает только участник той же роли, поэтому задача распадается на
+    независимые задачи о назначениях по ролям. Каждая решается венгерским методом
+    (linear_sum_assignment) на матрице участники x места, где оценка — 1 за занятое
+    место, плюс доля новых для команды навыков и надбавка недоукомплектованным
+    командам. Навыки команды берутся на момент построения индекса.
+    """
+    slots = usable_slots(index, max_team_size, max_teams)
+    understaffed = index.team_sizes < min_team_size
+    free = np.flatnonzero(~index.has_team)
+
+    result = []
+    for code, role in enumerate(ROLES):
+        people = free[index.participant_roles[free] == code]
+        places = slots[index.slot_roles[slots] == code]
+        if not len(people) or not len(places):
+            continue
+
+        teams = index.slot_teams[places]
+        counts = index.skill_counts[people, None]
+        new_skills = counts - index.participant_skills[people] @ index.team_skills[teams].T
+        scores = (
+            1
+            + SKILL_WEIGHT * new_skills / np.maximum(counts, 1)
+            + UNDERSTAFFED_BONUS * understaffed[teams]
+        )
+        rows, cols = linear_sum_assignment(scores, maximize=True)
+        for row, col in zip(rows.tolist(), cols.tolist(), strict=True):
+            person, place = people[row], places[col]
+            result.append(
+                Assignment(
+                    participant_id=int(index.participant_ids[person]),
+                    user_id=int(index.user_ids[person]),
+                    member_id=int(index.slot_ids[place]),
+                    team_id=int(index.team_ids[index.slot_teams[place]]),
+                    role=role,
+                    score=round(float(scores[row, col]), 3),
+                )
+            )
+    return result
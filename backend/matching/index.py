@@ -0,0 +1,147 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from db.models import RoleType
+
+ROLES = tuple(RoleType)
+ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+# совпадение роли со свободным местом весит больше, чем новые для команды навыки
+ROLE_WEIGHT = 1.0
+SKILL_WEIGHT = 0.5
+
+
+def _role_code(role) -> int:
+    return ROLE_CODES.get(role, -1)
+
+
+class SkillIndex:
+    """Снимок хакатона для подбора в виде матриц NumPy.
+
+    Строки participant_skills — участники, строки team_skills — навыки уже
+    занятых мест команды, столбцы обеих — навыки (skill_ids). open_slots[t, r] —
+    число свободных мест роли ROLES[r] в команде t. Индекс неизменяем: после
+    изменения состава строится новый.
+    """
+
+    def __init__(self, hack_id: int, participants: list[dict], slots: list[dict]):
+        self.hack_id = hack_id
+
+        skill_ids = sorted(
+            {skill_id for row in (*participants, *slots) for skill_id in row["skill_ids"] or ()}
+        )
+        self.skill_ids = np.array(skill_ids, dtype=np.int64)
+        column = {skill_id: i for i, skill_id in enumerate(skill_ids)}
+
+        self._team_rows: dict[int, int] = {}
+        team_ids, self.team_names, self.team_about, completed = [], [], [], []
+        for row in slots:
+            if row["team_id"] not in self._team_rows:
+                self._team_rows[row["team_id"]] = len(team_ids)
+                team_ids.append(row["team_id"])
+                self.team_names.append(row["name"])
+                self.team_about.append(row["about"])
+                completed.append(bool(row["is_completed"]))
+        self.team_ids = np.array(team_ids, dtype=np.int64)
+
+        self.open_slots = np.zeros((len(team_ids), len(ROLES)), dtype=np.int32)
+        self.team_sizes = np.zeros(len(team_ids), dtype=np.int32)
+        self.team_skills = np.zeros((len(team_ids), len(skill_ids)), dtype=np.float32)
+        # свободные места по одному: member_id, строка команды, код роли
+        slot_ids, slot_teams, slot_roles = [], [], []
+        members = set()
+        for row in slots:
+            team = self._team_rows[row["team_id"]]
+            # пустое место — user_id NULL или 0 (см. get_teams_with_empty_members)
+            if row["user_id"]:
+                members.add(row["user_id"])
+                self.team_sizes[team] += 1
+                for skill_id in row["skill_ids"] or ():
+                    self.team_skills[team, column[skill_id]] = 1
+            elif not completed[team] and (code := _role_code(row["role"])) >= 0:
+                self.open_slots[team, code] += 1
+                slot_ids.append(row["member_id"])
+                slot_teams.append(team)
+                slot_roles.append(code)
+        self.open_totals = self.open_slots.sum(axis=1)
+        self.slot_ids = np.array(slot_ids, dtype=np.int64)
+        self.slot_teams = np.array(slot_teams, dtype=np.int64)
+        self.slot_roles = np.array(slot_roles, dtype=np.int64)
+
+        user_ids = [row["user_id"] for row in participants]
+        self.participant_ids = np.array(
+            [row["participant_id"] for row in participants], dtype=np.int64
+        )
+        self.user_ids = np.array(user_ids, dtype=np.int64)
+        self.participant_roles = np.array(
+            [_role_code(row["role"]) for row in participants], dtype=np.int64
+        )
+        self.participant_skills = np.zeros((len(participants), len(skill_ids)), dtype=np.float32)
+        for i, row in enumerate(participants):
+            columns = [column[skill_id] for skill_id in row["skill_ids"] or ()]
+            self.participant_skills[i, columns] = 1
+        self.skill_counts = self.participant_skills.sum(axis=1)
+        self.has_team = np.array([user_id in members for user_id in user_ids], dtype=bool)
+        self._participant_rows = {user_id: i for i, user_id in enumerate(user_ids)}
+
+    def participant_row(self, user_id: int) -> int | None:
+        return self._participant_rows.get(user_id)
+
+    def team_row(self, team_id: int) -> int | None:
+        return self._team_rows.get(team_id)
+
+    def team_scores(self, row: int) -> np.ndarray:
+        """Оценки всех команд для участника; -inf у команд без свободных мест."""
+        skills = self.participant_skills[row]
+        # доля навыков участника, которых в команде ещё нет
+        new_skills = self.skill_counts[row] - self.team_skills @ skills
+        scores = SKILL_WEIGHT * new_skills / max(self.skill_counts[row], 1)
+        role = self.participant_roles[row]
+        if role >= 0:
+            scores += ROLE_WEIGHT * (self.open_slots[:, role] > 0)
+        scores[self.open_totals == 0] = -np.inf
+        return scores
+
+    def top_teams(self, row: int, limit: int) -> tuple[np.ndarray, np.ndarray]:
+        """Строки лучших команд для участника по убыванию оценки и сами оценки."""
+        return _top(self.team_scores(row), limit)
+
+    def participant_scores(self, team: int) -> np.ndarray:
+        """Оценки всех участников для команды; -inf у тех, кому в ней нет места.
+
+        Место есть, если участник без команды и у команды открыто место его роли.
+        """
+        new_skills = self.skill_counts - self.participant_skills @ self.team_skills[team]
+        scores = ROLE_WEIGHT + SKILL_WEIGHT * new_skills / np.maximum(self.skill_counts, 1)
+        open_roles = np.append(self.open_slots[team] > 0, False)  # код -1 — без роли
+        scores[~open_roles[self.participant_roles] | self.has_team] = -np.inf
+        return scores
+
+    def top_participants(
+        self, team: int, limit: int, exclude: Sequence[int] = ()
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Строки лучших участников для команды (кроме participant_id из exclude)."""
+        scores = self.participant_scores(team)
+        scores[np.isin(self.participant_ids, exclude)] = -np.inf
+        return _top(scores, limit)
+
+    def role_match(self, row: int, team: int) -> bool:
+        role = self.participant_roles[row]
+        return bool(role >= 0 and self.open_slots[team, role] > 0)
+
+    def open_roles(self, team: int) -> list[RoleType]:
+        return [ROLES[code] for code in np.flatnonzero(self.open_slots[team])]
+
+    def new_skill_ids(self, row: int, team: int) -> list[int]:
+        mask = (self.participant_skills[row] > 0) & (self.team_skills[team] == 0)
+        return self.skill_ids[mask].tolist()
+
+
+def _top(scores: np.ndarray, limit: int) -> tuple[np.ndarray, np.ndarray]:
+    # argpartition отбирает limit лучших за O(n), сортируются только они
+    candidates = np.flatnonzero(np.isfinite(scores))
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return order, scores[order]
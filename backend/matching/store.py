@@ -0,0 +1,86 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from config import MATCHING_INDEX_SIZE, MATCHING_INDEX_TTL
+from db import db
+from db.cache import RESET_MESSAGE, TTLCache
+from db.crud import get_matching_rows, shared_cache
+from metrics import histogram
+
+from .index import SkillIndex
+
+INDEX_BUILD_SECONDS = histogram("matching_index_build_seconds", "Построение индекса подбора")
+
+# сообщения канала инвалидации, после которых индекс хакатона устаревает
+INVALIDATING_PREFIXES = ("rosters", "participants")
+
+
+class IndexStore:
+    """Индексы подбора по хакатонам в памяти процесса.
+
+    Индекс строится одной задачей на все одновременные запросы и живёт до
+    сообщения об изменении составов или участников хакатона (on_invalidation)
+    либо до истечения TTL.
+    """
+
+    def __init__(
+        self, build: Callable[[int], Awaitable[SkillIndex]], maxsize: int = 64, ttl: float = 300
+    ):
+        self._build = build
+        self._cache = TTLCache("skill_index", maxsize=maxsize, ttl=ttl)
+        # номер версии хакатона: индекс, начатый до инвалидации, в кэш не попадает
+        self._generations: dict[int, int] = {}
+        self._pending: dict[int, asyncio.Task] = {}
+
+    async def get(self, hack_id: int) -> SkillIndex:
+        index = self._cache.get(hack_id)
+        if index is not None:
+            return index
+
+        task = self._pending.get(hack_id)
+        if task is None:
+            task = asyncio.create_task(self._load(hack_id))
+            self._pending[hack_id] = task
+            task.add_done_callback(lambda done: self._forget(hack_id, done))
+        # отмена одного запроса не должна отменять построение для остальных
+        return await asyncio.shield(task)
+
+    async def _load(self, hack_id: int) -> SkillIndex:
+        generation = self._generations.get(hack_id, 0)
+        with INDEX_BUILD_SECONDS.time():
+            index = await self._build(hack_id)
+        if self._generations.get(hack_id, 0) == generation:
+            self._cache.set(hack_id, index)
+        return index
+
+    def _forget(self, hack_id: int, task: asyncio.Task) -> None:
+        if self._pending.get(hack_id) is task:
+            del self._pending[hack_id]
+
+    def invalidate(self, hack_id: int) -> None:
+        self._generations[hack_id] = self._generations.get(hack_id, 0) + 1
+        self._cache.invalidate(hack_id)
+        self._pending.pop(hack_id, None)
+
+    def on_invalidation(self, message: str) -> None:
+        if message == RESET_MESSAGE:
+            # канал переподключился и мог потерять сообщения: сбрасываем все индексы
+            for hack_id in {*self._generations, *self._pending}:
+                self.invalidate(hack_id)
+            self._cache.clear()
+            return
+        prefix, _, hack_id = message.partition(":")
+        if prefix in INVALIDATING_PREFIXES and hack_id.isdigit():
+            self.invalidate(int(hack_id))
+
+
+async def build_index(hack_id: int) -> SkillIndex:
+    # primary, а не реплика: индекс строится сразу после инвалидации и не должен
+    # закэшировать отставшие данные
+    async with db.session() as session:
+        rows = await get_matching_rows(session, hack_id)
+    return SkillIndex(hack_id, rows["participants"], rows["slots"])
+
+
+skill_indexes = IndexStore(build_index, maxsize=MATCHING_INDEX_SIZE, ttl=MATCHING_INDEX_TTL)
+shared_cache.subscribe(skill_indexes.on_invalidation)
@@ -0,0 +1,210 @@
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+
+# Внутрипроцессные метрики: счётчики, гейджи и гистограммы с метками.
+# Обновляются из потока event loop, поэтому обходятся без блокировок.
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        return [
+            (f"{self.name}_total", dict(zip(self.labelnames, key, strict=True)), value)
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._functions: dict[tuple, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float], **labels) -> None:
+        # значение вычисляется в момент чтения (например, состояние пула)
+        self._functions[self._key(labels)] = fn
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._functions:
+            return self._functions[key]()
+        return self._values.get(key, 0)
+
+    def samples(self):
+        values = dict(self._values)
+        for key, fn in self._functions.items():
+            values[key] = fn()
+        return [
+            (self.name, dict(zip(self.labelnames, key, strict=True)), value)
+            for key, value in values.items()
+        ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # по ключу меток: [счётчики корзин (+Inf последней), сумма, количество]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def time(self, **labels) -> "_Timer":
+        return _Timer(self, labels)
+
+    def stats(self, **labels) -> dict:
+        state = self._values.get(self._key(labels))
+        if state is None:
+            return {"count": 0, "sum": 0.0}
+        return {"count": state[2], "sum": state[1]}
+
+    def samples(self):
+        result = []
+        for key, (counts, total, count) in self._values.items():
+            labels = dict(zip(self.labelnames, key, strict=True))
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                result.append((f"{self.name}_bucket", {**labels, "le": le}, cumulative))
+            result += [
+                (f"{self.name}_sum", labels, total),
+                (f"{self.name}_count", labels, count),
+            ]
+        return result
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        # повторная регистрация (например, при reload модуля) возвращает существующую метрику
+        return self._metrics.setdefault(metric.name, metric)
+
+    def collect(self) -> list[Metric]:
+        return list(self._metrics.values())
+
+
+REGISTRY = Registry()
+
+# формат text exposition 0.0.4, который читает Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str, quotes: bool = True) -> str:
+    # в HELP экранируются только \\ и перевод строки, в значениях меток — ещё и кавычки
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quotes else value
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(registry: Registry = REGISTRY) -> str:
+    lines = []
+    for metric in registry.collect():
+        lines += [
+            f"# HELP {metric.name} {_escape(metric.documentation, quotes=False)}",
+            f"# TYPE {metric.name} {metric.type}",
+        ]
+        for name, labels, value in metric.samples():
+            series = name
+            if labels:
+                pairs = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+                series = f"{name}{{{pairs}}}"
+            lines.append(f"{series} {_format_value(value)}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def counter(name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: tuple[str, ...] = (),
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import counter, gauge, histogram
+
+HASH_SECONDS = histogram("password_hash_seconds", "Время PBKDF2 в пуле", ("op",))
+HASH_RUNNING = gauge("password_hash_running", "PBKDF2, выполняющиеся в пуле")
+HASH_WAITING = gauge("password_hash_waiting", "PBKDF2 в очереди на пул")
+HASH_REJECTED = counter("password_hash_rejected", "Отказы из-за переполненной очереди PBKDF2")
+
+ALGORITHM = "pbkdf2_sha256"
+SALT_SIZE = 16
+
+# формат до параметризации: "<salt hex>:<hash hex>", sha256 и 100 000 итераций
+LEGACY_ITERATIONS = 100_000
+
+
+class HasherBusyError(Exception):
+    """Очередь на хэширование паролей переполнена."""
+
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+
+
+def hash_password(password: str, iterations: int) -> str:
+    salt = os.urandom(SALT_SIZE)
+    digest = _pbkdf2(password, salt, iterations)
+    return f"{ALGORITHM}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def parse_hash(hashed: str) -> tuple[int, bytes, bytes]:
+    """Итерации, соль и хэш из сохранённой строки; понимает и старый формат."""
+    if hashed.startswith(f"{ALGORITHM}$"):
+        _, iterations, salt, digest = hashed.split("$")
+        return int(iterations), bytes.fromhex(salt), bytes.fromhex(digest)
+    salt, digest = hashed.split(":")
+    return LEGACY_ITERATIONS, bytes.fromhex(salt), bytes.fromhex(digest)
+
+
+def check_password(password: str, hashed: str) -> bool:
+    try:
+        iterations, salt, digest = parse_hash(hashed)
+    except ValueError:
+        return False
+    return hmac.compare_digest(_pbkdf2(password, salt, iterations), digest)
+
+
+def needs_rehash(hashed: str, iterations: int) -> bool:
+    return not hashed.startswith(f"{ALGORITHM}${iterations}$")
+
+
+class PasswordHasher:
+    """PBKDF2 в отдельном пуле потоков, чтобы вход не блокировал event loop.
+
+    hashlib отпускает GIL на время PBKDF2, поэтому потоков достаточно. Одновременно
+    считается не больше workers хэшей; если ждущих больше max_queue, запрос
+    отклоняется сразу (HasherBusyError), а не копится в очереди.
+    """
+
+    def __init__(self, iterations: int, workers: int = 2, max_queue: int = 64):
+        self.iterations = iterations
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(workers)
+        self._waiting = 0
+
+    async def _run(self, op: str, fn, *args):
+        if self._waiting >= self.max_queue:
+            HASH_REJECTED.inc()
+            raise HasherBusyError
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="pbkdf2")
+
+        self._waiting += 1
+        HASH_WAITING.inc()
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+            HASH_WAITING.dec()
+
+        HASH_RUNNING.inc()
+        try:
+            with HASH_SECONDS.time(op=op):
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._executor, fn, *args
+                )
+        finally:
+            HASH_RUNNING.dec()
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password, self.iterations)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run("verify", check_password, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return needs_rehash(hashed, self.iterations)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
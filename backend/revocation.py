@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import logging
+import math
+from datetime import datetime
+
+from config import REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE
+from db import db
+from db.cache import RESET_MESSAGE, TTLCache
+from db.crud import get_revoked_token_ids, purge_revoked_tokens, revoke_tokens, shared_cache
+from metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHECKS = counter("revocation_checks", "Проверки отзыва токенов", ("result",))
+REVOCATION_SIZE = gauge("revocation_filter_size", "Отозванные токены в фильтре процесса")
+
+# сообщение канала инвалидации shared_cache об отзыве токена
+MESSAGE_PREFIX = "revoked:"
+# значение в кэше подтверждённых отзывов
+CONFIRMED = "revoked"
+
+
+class BloomFilter:
+    """Фильтр Блума: «нет» — точно нет, «да» — возможно (с долей ошибок error_rate)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # двойное хэширование: k позиций из двух 64-битных половин одного blake2b
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key)
+        )
+
+
+class RevocationStore:
+    """Список отозванных токенов: таблица revoked_tokens и фильтр Блума в каждом воркере.
+
+    Проверка токена — несколько обращений к фильтру; в БД идём только при
+    положительном ответе фильтра (отозванный токен или редкая ложная тревога).
+    Отзыв пишется в таблицу и рассылается воркерам через канал shared_cache;
+    пропущенные сообщения догоняет периодический load().
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        # id, отозванные во время load(): переносятся в новый фильтр
+        self._added_while_loading: list[str] | None = None
+        # подтверждённые в БД ответы, чтобы отозванный токен не ходил в БД каждый раз
+        self._confirmed = TTLCache("revocation", maxsize=4096, ttl=60)
+        # перезагрузка после переподключения к каналу; ссылка держит задачу живой
+        self._reload_task: asyncio.Task | None = None
+
+    def _add(self, token_id: str) -> None:
+        self._filter.add(token_id)
+        if self._added_while_loading is not None:
+            self._added_while_loading.append(token_id)
+        REVOCATION_SIZE.set(self._filter.count)
+
+    async def load(self) -> None:
+        """Пересобирает фильтр по таблице; истёкшие записи при этом выпадают."""
+        self._added_while_loading = []
+        try:
+            async with db.session() as session:
+                token_ids = await get_revoked_token_ids(session)
+            fresh = BloomFilter(max(self.capacity, 2 * len(token_ids)), self.error_rate)
+            for token_id in (*token_ids, *self._added_while_loading):
+                fresh.add(token_id)
+            self._filter = fresh
+        finally:
+            self._added_while_loading = None
+        REVOCATION_SIZE.set(self._filter.count)
+
+    async def purge(self) -> int:
+        async with db.session() as session:
+            return await purge_revoked_tokens(session)
+
+    async def revoke(self, entries: dict[str, datetime]) -> list[str]:
+        """Отзывает id до указанных моментов; возвращает те, что отозваны впервые."""
+        async with db.session() as session:
+            inserted = await revoke_tokens(session, entries)
+        for token_id in entries:
+            self._add(token_id)
+            self._confirmed.set(token_id, CONFIRMED)
+        for token_id in inserted:
+            await shared_cache.publish(f"{MESSAGE_PREFIX}{token_id}")
+        return inserted
+
+    async def is_revoked(self, *token_ids: str) -> bool:
+        suspects = [token_id for token_id in token_ids if token_id in self._filter]
+        if not suspects:
+            REVOCATION_CHECKS.inc(result="clean")
+            return False
+        if any(self._confirmed.get(token_id) == CONFIRMED for token_id in suspects):
+            REVOCATION_CHECKS.inc(result="revoked")
+            return True
+
+        async with db.session() as session:
+            revoked = await get_revoked_token_ids(session, suspects)
+        for token_id in revoked:
+            self._confirmed.set(token_id, CONFIRMED)
+        REVOCATION_CHECKS.inc(result="revoked" if revoked else "false_positive")
+        return bool(revoked)
+
+    def on_message(self, message: str) -> None:
+        if message.startswith(MESSAGE_PREFIX):
+            self._add(message.removeprefix(MESSAGE_PREFIX))
+        elif message == RESET_MESSAGE and (self._reload_task is None or self._reload_task.done()):
+            # пока канал был недоступен, отзывы могли пройти мимо: догоняем по таблице
+            self._reload_task = asyncio.create_task(self._reload())
+
+    async def _reload(self) -> None:
+        try:
+            await self.load()
+        except Exception:
+            logger.exception("Failed to reload revoked tokens")
+
+
+revocations = RevocationStore(REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE)
+shared_cache.subscribe(revocations.on_message)
@@ -0,0 +1,102 @@
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Response
+from fastapi.middleware.cors import CORSMiddleware
+
+# регистрирует служебные периодические задачи в scheduler и runner
+import jobs.maintenance  # ruff: ignore[unused-import]
+from bot import start_bot
+from config import JOBS_ENABLED
+from db import db
+from db.crud import shared_cache
+from dependencies import password_hasher
+from jobs import runner as job_runner, scheduler
+from metrics import CONTENT_TYPE, render
+from revocation import revocations
+from server.events import broadcaster
+from server.mw import ErrorHandlerMiddleware
+from server.routes import (
+    hack_router,
+    org_auth_router,
+    org_events_router,
+    org_exports_router,
+    org_hacks_router,
+    org_jobs_router,
+    org_public_router,
+    org_teams_router,
+    team_router,
+    user_router,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    import asyncio
+
+    await db.connect()
+    await shared_cache.start()
+    await revocations.load()
+    await broadcaster.start()
+    await scheduler.start()
+    if JOBS_ENABLED:
+        await job_runner.start()
+    bot_task = asyncio.create_task(start_bot())
+    yield
+    bot_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await bot_task
+    await job_runner.stop()
+    await scheduler.stop()
+    password_hasher.close()
+    await broadcaster.stop()
+    await shared_cache.close()
+    await db.disconnect()
+
+
+app = FastAPI(
+    title="pay2win API",
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost:5173", "https://test.xn--80aaaaga5bxbek0bk.xn--p1ai"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(ErrorHandlerMiddleware)
+
+
+@app.get("/")
+async def root():
+    return {"message": "API работает! Добро пожаловать на хакатон!"}
+
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy", "service": "backend"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # метрики процесса: при нескольких воркерах Prometheus опрашивает каждый
+    return Response(render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/health/db")
+async def db_health_check():
+    return {"status": "healthy", "pool": db.pool_stats()}
+
+
+app.include_router(hack_router)
+app.include_router(team_router)
+app.include_router(user_router)
+app.include_router(org_auth_router)
+app.include_router(org_teams_router)
+app.include_router(org_exports_router)
+app.include_router(org_events_router)
+app.include_router(org_public_router)
+app.include_router(org_hacks_router)
+app.include_router(org_jobs_router)
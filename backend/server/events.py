@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import suppress
+
+import asyncpg
+
+from config import EVENTS_QUEUE_SIZE
+from db import db
+from db.crud import EVENTS_CHANNEL
+from metrics import counter, gauge
+
+EVENTS_RECEIVED = counter("events_received", "События, полученные через LISTEN")
+EVENTS_DROPPED = counter("events_dropped", "События, вытесненные из очереди медленного клиента")
+EVENTS_SUBSCRIBERS = gauge("events_subscribers", "Подписчики на события хакатонов")
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Очередь событий одного клиента фиксированного размера.
+
+    Если клиент не успевает читать или события могли потеряться, флаг lagged
+    говорит ему перечитать состояние целиком.
+    """
+
+    def __init__(self, hack_id: int, maxsize: int):
+        self.hack_id = hack_id
+        # None в очереди только будит get() после mark_lagged
+        self.queue: asyncio.Queue[dict | None] = asyncio.Queue(maxsize)
+        self.lagged = False
+
+    def put(self, event: dict) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.lagged = True
+            EVENTS_DROPPED.inc()
+        self.queue.put_nowait(event)
+
+    def mark_lagged(self) -> None:
+        # клиент перечитает состояние целиком, поэтому накопленные события не нужны
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.lagged = True
+        self.queue.put_nowait(None)
+
+    async def get(self, wait: float) -> dict | None:
+        try:
+            return await asyncio.wait_for(self.queue.get(), wait)
+        except TimeoutError:
+            return None
+
+
+class EventBroadcaster:
+    """Раздаёт события хакатонов подписчикам процесса.
+
+    Источник один — LISTEN на канале EVENTS_CHANNEL: запись в БД делает pg_notify
+    в своей транзакции, и событие получают все воркеры, включая текущий.
+    """
+
+    def __init__(self, queue_size: int = 100, reconnect_delay: float = 1):
+        self.queue_size = queue_size
+        self.reconnect_delay = reconnect_delay
+        self._subscribers: dict[int, set[Subscription]] = defaultdict(set)
+        self._task: asyncio.Task | None = None
+        self._connected = False
+
+    def subscribe(self, hack_id: int) -> Subscription:
+        subscription = Subscription(hack_id, self.queue_size)
+        self._subscribers[hack_id].add(subscription)
+        EVENTS_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.hack_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.hack_id]
+        EVENTS_SUBSCRIBERS.dec()
+
+    def publish(self, event: dict) -> None:
+        for subscription in list(self._subscribers.get(event.get("hackathon_id"), ())):
+            subscription.put(event)
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        EVENTS_RECEIVED.inc()
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Malformed event payload: %s", payload)
+            return
+        self.publish(event)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def _resync(self) -> None:
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.mark_lagged()
+
+    async def _listen(self) -> None:
+        # NOTIFY, пришедшие пока LISTEN-соединение лежало, потеряны: после каждого
+        # переподключения подписчики перечитывают состояние (resync)
+        resumed = False
+        while True:
+            try:
+                await self._listen_once(resumed)
+                logger.warning("Event listener connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Event listener failed, reconnecting")
+            resumed = resumed or self._connected
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _listen_once(self, resumed: bool) -> None:
+        # отдельное соединение вне пула: LISTEN держит его всё время работы воркера
+        url = db.url
+        self._connected = False
+        connection = await asyncpg.connect(
+            user=url.username,
+            password=url.password,
+            host=url.host,
+            port=url.port,
+            database=url.database,
+        )
+        try:
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _connection: closed.set())
+            await connection.add_listener(EVENTS_CHANNEL, self._on_notify)
+            self._connected = True
+            if resumed:
+                self._resync()
+            await closed.wait()
+        finally:
+            if not connection.is_closed():
+                with suppress(Exception):
+                    await asyncio.shield(connection.close())
+
+
+def format_sse(event: dict, event_id: int) -> str:
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"id: {event_id}\nevent: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+
+broadcaster = EventBroadcaster(queue_size=EVENTS_QUEUE_SIZE)
@@ -1,21 +1,115 @@
 import logging
+import time
 
 from starlette.exceptions import HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db.postgre import QueryStats, query_stats
+from metrics import gauge, histogram
 
 logger = logging.getLogger("uvicorn.error")
 
+REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса по шаблону маршрута",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = gauge(
+    "http_requests_in_flight", "HTTP-запросы в обработке, включая открытые потоки событий"
+)
+REQUEST_QUERIES = histogram(
+    "http_request_db_queries",
+    "Число SQL-запросов на HTTP-запрос",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_SECONDS = histogram(
+    "http_request_db_seconds", "Суммарное время SQL-запросов за HTTP-запрос", ("route",)
+)
+
+# запросы мимо маршрутов (404, сканеры) не должны плодить метки
+UNMATCHED_ROUTE = "unmatched"
+
+
+class ErrorHandlerMiddleware:
+    """Превращает необработанные исключения в JSON и снимает метрики запросов.
+
+    Чистый ASGI, а не BaseHTTPMiddleware: ответ не перекладывается через
+    промежуточную задачу и очередь, поэтому StreamingResponse и SSE уходят
+    клиенту по мере генерации. Время пишется по шаблону маршрута
+    (/api/hack/{hack_id}), а не по фактическому пути, вместе с числом и временем
+    SQL-запросов; потоки событий (text/event-stream) живут сколько угодно и в
+    гистограммы не попадают.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # endpoint -> шаблон пути; строится при первом запросе, когда роуты уже подключены
+        self._routes: dict | None = None
+
+    def route_template(self, scope: Scope) -> str:
+        if self._routes is None:
+            self._routes = {}
+            for route in getattr(scope.get("app"), "routes", ()):
+                endpoint = getattr(route, "endpoint", None)
+                if endpoint is not None:
+                    self._routes.setdefault(endpoint, route.path)
+        return self._routes.get(scope.get("endpoint"), UNMATCHED_ROUTE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        queries = QueryStats()
+        queries_token = query_stats.set(queries)
+        REQUESTS_IN_FLIGHT.inc()
+        status_code = 500
+        response_started = False
+        streaming = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started, streaming
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                streaming = self._is_event_stream(message)
+            await send(message)
 
-class ErrorHandlerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
         try:
-            response = await call_next(request)
-        except HTTPException as e:
-            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            raise e  # для тестов
-            logger.error(str(e))
-            return JSONResponse(status_code=500, content={"detail": str(e)})
-        else:
-            return response
+            if not isinstance(e, HTTPException):
+                logger.exception("Unhandled error on %s %s", scope["method"], scope["path"])
+            if response_started:
+                # заголовки уже ушли: подменить ответ нельзя, соединение закроет сервер
+                raise
+            response = self._error_response(e)
+            status_code = response.status_code
+            await response(scope, receive, send)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            query_stats.reset(queries_token)
+            if not streaming:
+                self._record(scope, time.perf_counter() - start, status_code, queries)
+
+    @staticmethod
+    def _is_event_stream(message: Message) -> bool:
+        for name, value in message.get("headers", ()):
+            if name.lower() == b"content-type":
+                return value.startswith(b"text/event-stream")
+        return False
+
+    @staticmethod
+    def _error_response(error: Exception) -> JSONResponse:
+        if isinstance(error, HTTPException):
+            return JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+        return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+
+    def _record(self, scope: Scope, seconds: float, status_code: int, queries: QueryStats) -> None:
+        route = self.route_template(scope)
+        REQUEST_SECONDS.observe(seconds, method=scope["method"], route=route, status=status_code)
+        REQUEST_QUERIES.observe(queries.count, route=route)
+        REQUEST_DB_SECONDS.observe(queries.seconds, route=route)
@@ -1,7 +1,23 @@
 from .hack.handler import router as hack_router
 from .hack.team.handler import router as team_router
 from .org.handlers.auth import router as org_auth_router
+from .org.handlers.events import router as org_events_router
+from .org.handlers.exports import router as org_exports_router
 from .org.handlers.hackathons import router as org_hacks_router
+from .org.handlers.jobs import router as org_jobs_router
 from .org.handlers.public import router as org_public_router
 from .org.handlers.teams import router as org_teams_router
 from .user.handler import router as user_router
+
+__all__ = [
+    "hack_router",
+    "org_auth_router",
+    "org_events_router",
+    "org_exports_router",
+    "org_hacks_router",
+    "org_jobs_router",
+    "org_public_router",
+    "org_teams_router",
+    "team_router",
+    "user_router",
+]
@@ -1,10 +1,14 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date
 from math import ceil
+from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.status import HTTP_404_NOT_FOUND
+from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
 
 from db import crud, get_session
+from dependencies import ReadSession
 
 from .schema import HackListSchema, HackSchema, MetaSchema
 
@@ -28,16 +32,41 @@ async def get_hack_by_id(hack_id: int, session: AsyncSession = Depends(get_sessi
     )
 
 
+def encode_cursor(hack) -> str:
+    raw = f"{hack.start_date.isoformat()}:{hack.id}"
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        start_date, hack_id = raw.split(":")
+        return date.fromisoformat(start_date), int(hack_id)
+    except ValueError:
+        raise HTTPException(HTTP_400_BAD_REQUEST, "Некорректный курсор.") from None
+
+
 @router.get("/hacks/all")
 async def get_all_hacks(
-    page: int = Query(1, ge=1),  # 1 <= page
-    per_page: int = Query(20, ge=1, le=50),  # 1 <= per_page <= 50
-    session: AsyncSession = Depends(get_session),
+    session: ReadSession,
+    page: Annotated[int, Query(ge=1)] = 1,
+    per_page: Annotated[int, Query(ge=1, le=50)] = 20,
+    after: Annotated[
+        str | None, Query(description="Курсор meta.next_cursor предыдущей страницы")
+    ] = None,
 ) -> HackListSchema:
-    offset = (page - 1) * per_page
-    hacks = await crud.get_hacks(session, offset=offset, limit=per_page)
+    if after is not None:
+        hacks = await crud.get_hacks(session, limit=per_page + 1, after=decode_cursor(after))
+    else:
+        offset = (page - 1) * per_page
+        hacks = await crud.get_hacks(session, offset=offset, limit=per_page + 1)
     total = await crud.count_hacks(session)
 
+    # лишняя строка показывает, есть ли следующая страница
+    has_next = len(hacks) > per_page
+    hacks = hacks[:per_page]
+    next_cursor = encode_cursor(hacks[-1]) if has_next else None
+
     items = [
         HackSchema(
             id=hack.id,
@@ -71,12 +100,60 @@ async def get_all_hacks(
             page=page,
             per_page=per_page,
             total_pages=total_pages,
+            next_cursor=next_cursor,
+        ),
+    )
+
+
+@router.get("/hacks/search")
+async def search_hacks(
+    session: ReadSession,
+    q: Annotated[
+        str | None, Query(min_length=1, max_length=200, description="Поисковый запрос")
+    ] = None,
+    tags: Annotated[str | None, Query(description="Теги через запятую, нужны все")] = None,
+    date_from: Annotated[date | None, Query(description="Хакатоны, идущие с этой даты")] = None,
+    date_to: Annotated[date | None, Query(description="Хакатоны, начавшиеся до этой даты")] = None,
+    page: Annotated[int, Query(ge=1)] = 1,
+    per_page: Annotated[int, Query(ge=1, le=50)] = 20,
+) -> HackListSchema:
+    tag_list = [tag for tag in (tags or "").split(",") if tag.strip()]
+    hacks, total = await crud.search_hacks(
+        session,
+        query=q,
+        tags=tag_list,
+        date_from=date_from,
+        date_to=date_to,
+        offset=(page - 1) * per_page,
+        limit=per_page,
+    )
+
+    return HackListSchema(
+        hacks=[
+            HackSchema(
+                id=hack.id,
+                name=hack.name,
+                description=hack.description,
+                photo_url=hack.photo_url,
+                start_date=hack.start_date,
+                end_date=hack.end_date,
+                tags=hack.tags,
+            )
+            for hack in hacks
+        ],
+        meta=MetaSchema(
+            total=total,
+            page=page,
+            per_page=per_page,
+            total_pages=ceil(total / per_page),
         ),
     )
 
 
 @router.get("/hacks/upcoming")
-async def get_upcoming_hacks(session: AsyncSession = Depends(get_session)) -> HackListSchema:
+async def get_upcoming_hacks(
+    session: ReadSession,
+) -> HackListSchema:
     hacks = await crud.get_upcoming_hacks(session)
 
     return HackListSchema(
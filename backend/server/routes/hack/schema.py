@@ -18,6 +18,7 @@ class MetaSchema(BaseModel):
     page: int
     per_page: int
     total_pages: int
+    next_cursor: str | None = None
 
 
 class HackListSchema(BaseModel):
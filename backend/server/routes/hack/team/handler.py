@@ -1,10 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from contextlib import suppress
+from typing import Annotated
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.status import HTTP_404_NOT_FOUND, HTTP_409_CONFLICT
+from starlette.status import HTTP_403_FORBIDDEN, HTTP_404_NOT_FOUND, HTTP_409_CONFLICT
 
 from bot.routes.invites import send_join_request, send_team_invite
-from db import crud, get_session
+from config import EVENTS_HEARTBEAT_SECONDS
+from db import crud, db, get_session
+from db.loading import TEAM_ROSTER
+from dependencies import CurrentUserId, ReadSession
+from matching import ROLES, skill_indexes
+from server.events import Subscription, broadcaster
 from utils import get_current_user_id
 
 from ...user.schema import SkillSchema
@@ -12,8 +29,10 @@ from .schema import (
     EmptyRoleSchema,
     ParticipantSchema,
     ParticipantsListSchema,
+    ParticipantSuggestionSchema,
     ProfileSchema,
     TeamCreateSchema,
+    TeamRecommendationSchema,
     TeamResponseSchema,
     TeamWithEmptyRolesSchema,
 )
@@ -60,25 +79,75 @@ async def get_user_team(
 async def get_team(
     hack_id: int, team_id: int, db: AsyncSession = Depends(get_session)
 ) -> TeamResponseSchema:
-    team = await crud.get_team_by_id(db, team_id)
+    team = await crud.get_team_by_id(db, team_id, load=TEAM_ROSTER)
     if not team:
         raise HTTPException(404, detail="Нету такой еблан")
 
-    members = await crud.get_team_members_by_team_id(db, team_id)
     return TeamResponseSchema(
         id=team.id,
         name=team.name,
         hackathon_id=team.hackathon_id,
         is_completed=team.is_completed,
-        members=members,
+        members=team.team_members,
     )
 
 
+@router.get("/team/{team_id}/suggestions", response_model=list[ParticipantSuggestionSchema])
+async def suggest_participants(
+    hack_id: int,
+    team_id: int,
+    db: ReadSession,
+    user_id: CurrentUserId,
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+):
+    """Участники без команды, подходящие на свободные роли команды, по убыванию оценки.
+
+    Те, кому команда уже отправила приглашение (или кто подал заявку), не показываются.
+    """
+    own_team = await crud.get_team_by_hack_user(db, hack_id, user_id)
+    if own_team is None or own_team.id != team_id:
+        raise HTTPException(HTTP_403_FORBIDDEN, detail="это не твоя команда")
+
+    index = await skill_indexes.get(hack_id)
+    team = index.team_row(team_id)
+    if team is None:
+        raise HTTPException(HTTP_404_NOT_FOUND, detail="Нету такой команды")
+
+    invited = await crud.get_pending_invite_participant_ids(db, team_id)
+    rows, scores = index.top_participants(team, limit, exclude=invited)
+    rows = rows.tolist()
+    users = {
+        user.id: user
+        for user in await crud.get_users_by_ids(db, [int(index.user_ids[row]) for row in rows])
+    }
+    skill_names = {skill.id: skill.name for skill in await crud.get_skills(db)}
+    suggestions = []
+    for row, score in zip(rows, scores.tolist(), strict=True):
+        user = users.get(int(index.user_ids[row]))
+        if user is None:
+            continue
+        suggestions.append(
+            ParticipantSuggestionSchema(
+                participant_id=int(index.participant_ids[row]),
+                user_id=user.id,
+                name=user.name,
+                avatar_url=user.avatar_url,
+                role=ROLES[index.participant_roles[row]],
+                score=round(score, 3),
+                new_skills=[
+                    skill_names.get(skill_id, str(skill_id))
+                    for skill_id in index.new_skill_ids(row, team)
+                ],
+            )
+        )
+    return suggestions
+
+
 @router.get(
     "/teams/search",
     response_model=list[TeamWithEmptyRolesSchema],
 )
-async def search_teams_with_empty_members(hack_id: int, db: AsyncSession = Depends(get_session)):
+async def search_teams_with_empty_members(hack_id: int, db: ReadSession):
     teams_with_empty = await crud.get_teams_with_empty_members(db, hackathon_id=hack_id)
     result = []
     for item in teams_with_empty:
@@ -96,6 +165,103 @@ async def search_teams_with_empty_members(hack_id: int, db: AsyncSession = Depen
     return result
 
 
+@router.get("/teams/recommended", response_model=list[TeamRecommendationSchema])
+async def recommend_teams(
+    hack_id: int,
+    db: ReadSession,
+    user_id: CurrentUserId,
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+):
+    """Команды со свободными местами, лучше всего подходящие участнику по роли и навыкам."""
+    index = await skill_indexes.get(hack_id)
+    row = index.participant_row(user_id)
+    if row is None:
+        raise HTTPException(HTTP_404_NOT_FOUND, detail="ты не участник этого хакатона")
+    if index.has_team[row]:
+        raise HTTPException(HTTP_409_CONFLICT, detail="уже в команде/создал команду")
+
+    skill_names = {skill.id: skill.name for skill in await crud.get_skills(db)}
+    teams, scores = index.top_teams(row, limit)
+    return [
+        TeamRecommendationSchema(
+            id=int(index.team_ids[team]),
+            name=index.team_names[team],
+            about=index.team_about[team],
+            score=round(float(score), 3),
+            role_match=index.role_match(row, team),
+            open_roles=index.open_roles(team),
+            new_skills=[
+                skill_names.get(skill_id, str(skill_id))
+                for skill_id in index.new_skill_ids(row, team)
+            ],
+        )
+        for team, score in zip(teams.tolist(), scores.tolist(), strict=True)
+    ]
+
+
+async def vacancy_snapshot(hack_id: int) -> list[dict]:
+    sessionmaker = await db.read_sessionmaker()
+    async with sessionmaker() as session:
+        teams_with_empty = await crud.get_teams_with_empty_members(session, hackathon_id=hack_id)
+    return [
+        TeamWithEmptyRolesSchema(
+            id=item["team"].id,
+            name=item["team"].name,
+            hackathon_id=item["team"].hackathon_id,
+            about=item["team"].about,
+            empty_roles=[EmptyRoleSchema(role=member.role) for member in item["members"]],
+        ).model_dump(mode="json")
+        for item in teams_with_empty
+    ]
+
+
+@router.websocket("/teams/ws")
+async def watch_team_vacancies(websocket: WebSocket, hack_id: int):
+    """Подписка на вакансии команд: сначала снимок, затем изменения по командам.
+
+    Сообщения: {"type": "snapshot", "teams": [...]} и {"type": "team", "team": {...}};
+    команда без свободных ролей приходит с пустым empty_roles.
+    """
+    await websocket.accept()
+    # подписываемся до снимка, чтобы не потерять изменения между ними
+    subscription = broadcaster.subscribe(hack_id)
+    receiver = asyncio.create_task(drain_client(websocket))
+    try:
+        await websocket.send_json({"type": "snapshot", "teams": await vacancy_snapshot(hack_id)})
+        while not receiver.done():
+            await forward_vacancy_event(websocket, hack_id, subscription)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        broadcaster.unsubscribe(subscription)
+        receiver.cancel()
+
+
+async def forward_vacancy_event(
+    websocket: WebSocket, hack_id: int, subscription: Subscription
+) -> None:
+    event = await subscription.get(EVENTS_HEARTBEAT_SECONDS)
+    if subscription.lagged:
+        # очередь переполнялась: проще прислать снимок заново
+        subscription.lagged = False
+        snapshot = await vacancy_snapshot(hack_id)
+        await websocket.send_json({"type": "snapshot", "teams": snapshot})
+    elif event is None:
+        await websocket.send_json({"type": "ping"})
+    elif event["type"] == "vacancies_changed":
+        team = {"id": event["data"]["team_id"], "hackathon_id": hack_id, **event["data"]}
+        team.pop("team_id")
+        team["empty_roles"] = [{"role": role} for role in team["empty_roles"]]
+        await websocket.send_json({"type": "team", "team": team})
+
+
+async def drain_client(websocket: WebSocket) -> None:
+    # клиент ничего не присылает; читаем только чтобы заметить отключение
+    with suppress(WebSocketDisconnect):
+        while True:
+            await websocket.receive_text()
+
+
 @router.post("/participant")
 async def create_participant(
     hack_id: int,
@@ -114,7 +280,7 @@ async def create_participant(
 
 
 @router.get("/participants/search", response_model=ParticipantsListSchema)
-async def search_ParticipantsListSchema(hack_id: int, db: AsyncSession = Depends(get_session)):
+async def search_ParticipantsListSchema(hack_id: int, db: ReadSession):
     participants = await crud.get_participants_by_hack_id(db, hack_id)
 
     return ParticipantsListSchema(
@@ -43,6 +43,26 @@ class TeamWithEmptyRolesSchema(BaseModel):
     empty_roles: list[EmptyRoleSchema]
 
 
+class TeamRecommendationSchema(BaseModel):
+    id: int
+    name: str
+    about: str
+    score: float
+    role_match: bool
+    open_roles: list[RoleType]
+    new_skills: list[str]
+
+
+class ParticipantSuggestionSchema(BaseModel):
+    participant_id: int
+    user_id: int
+    name: str
+    avatar_url: str | None = None
+    role: RoleType
+    score: float
+    new_skills: list[str]
+
+
 class ParticipantSchema(BaseModel):
     id: int
     profile: ProfileSchema
@@ -1,11 +1,17 @@
 from .auth import router as organizer_auth_router
+from .events import router as organizer_events_router
+from .exports import router as organizer_exports_router
 from .hackathons import router as organizer_hackathons_router
+from .jobs import router as organizer_jobs_router
 from .public import router as public_router
 from .teams import router as organizer_teams_router
 
 __all__ = [
     "organizer_auth_router",
+    "organizer_events_router",
+    "organizer_exports_router",
     "organizer_hackathons_router",
+    "organizer_jobs_router",
     "organizer_teams_router",
     "public_router",
 ]
@@ -1,21 +1,65 @@
 # routers/organizer_auth.py
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import Annotated
+
+from fastapi import APIRouter, Body, Cookie, Depends, HTTPException, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db import get_session
 from db.models import OrganizerModel
 from dependencies import (
+    CurrentOrganizer,
+    DbSession,
     create_access_token,
-    get_current_organizer_cookie,
+    get_organizer_principal,
     get_password_hash,
+    password_needs_rehash,
     verify_password,
 )
+from tokens import (
+    REFRESH_COOKIE,
+    create_refresh_token,
+    new_token_id,
+    revoke_token,
+    rotate_refresh_token,
+    set_refresh_cookie,
+)
 from ..schemas.hackathon import ErrorResponse
 from ..schemas.organizer import OrganizerLogin, OrganizerResponse, Token
 
 router = APIRouter(prefix="/organizer", tags=["organizer_auth"])
 
+# refresh-кука не уходит на запросы участников и публичного API
+REFRESH_PATH = "/organizer"
+
+
+def issue_tokens(response: Response, organizer_id: int, login: str, family: str) -> Token:
+    access_token = create_access_token(
+        data={"sub": str(organizer_id), "role": "organizer"}, family=family
+    )
+    refresh_token = create_refresh_token(organizer_id, "organizer", family)
+
+    # Устанавливаем куки
+    response.set_cookie(
+        key="access_token",
+        value=access_token,
+        httponly=True,
+        max_age=1800,  # 30 минут
+        samesite="lax",
+        secure=False,  # В продакшене должно быть True при HTTPS
+    )
+    response.set_cookie(
+        key="user_id", value=str(organizer_id), max_age=1800, samesite="lax", secure=False
+    )
+    set_refresh_cookie(response, refresh_token, path=REFRESH_PATH)
+
+    return Token(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        token_type="bearer",
+        organizer=OrganizerResponse(id=organizer_id, login=login),
+    )
+
 
 @router.post(
     "/login",
@@ -27,8 +71,9 @@ router = APIRouter(prefix="/organizer", tags=["organizer_auth"])
     **Устанавливает куки:**
     - `access_token`: JWT токен (httpOnly, 30 минут)
     - `user_id`: ID организатора (30 минут)
+    - `refresh_token`: refresh-токен для `/organizer/refresh` (httpOnly)
     
-    **Также возвращает токен в теле ответа** для использования в заголовках.
+    **Также возвращает токены в теле ответа** для использования в заголовках.
     """,
     responses={
         200: {"description": "Успешный вход, устанавливает куки и возвращает JWT токен"},
@@ -43,30 +88,16 @@ async def organizer_login(
     )
     organizer = result.scalar_one_or_none()
 
-    if not organizer or not verify_password(credentials.password, organizer.password_hash):
+    if not organizer or not await verify_password(credentials.password, organizer.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Неверный логин или пароль"
         )
 
-    access_token = create_access_token(data={"sub": str(organizer.id), "role": "organizer"})
+    if password_needs_rehash(organizer.password_hash):
+        organizer.password_hash = await get_password_hash(credentials.password)
+        await session.commit()
 
-    # Устанавливаем куки
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        max_age=1800,  # 30 минут
-        samesite="lax",
-        secure=False,  # В продакшене должно быть True при HTTPS
-    )
-
-    response.set_cookie(
-        key="user_id", value=str(organizer.id), max_age=1800, samesite="lax", secure=False
-    )
-
-    organizer_response = OrganizerResponse(id=organizer.id, login=organizer.login)
-
-    return Token(access_token=access_token, token_type="bearer", organizer=organizer_response)
+    return issue_tokens(response, organizer.id, organizer.login, new_token_id())
 
 
 @router.post(
@@ -95,28 +126,15 @@ async def organizer_register(
         )
 
     organizer = OrganizerModel(
-        login=credentials.login, password_hash=get_password_hash(credentials.password)
+        login=credentials.login, password_hash=await get_password_hash(credentials.password)
     )
 
     session.add(organizer)
     await session.commit()
     await session.refresh(organizer)
 
-    access_token = create_access_token(data={"sub": str(organizer.id), "role": "organizer"})
-
     # Устанавливаем куки после регистрации (auto-login)
-    response.set_cookie(
-        key="access_token",
-        value=access_token,
-        httponly=True,
-        max_age=1800,
-        samesite="lax",
-        secure=False,
-    )
-
-    organizer_response = OrganizerResponse(id=organizer.id, login=organizer.login)
-
-    return Token(access_token=access_token, token_type="bearer", organizer=organizer_response)
+    return issue_tokens(response, organizer.id, organizer.login, new_token_id())
 
 
 @router.get(
@@ -130,20 +148,59 @@ async def organizer_register(
     },
 )
 async def get_current_user(
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
+    current_organizer: CurrentOrganizer,
 ):
     return OrganizerResponse(
         id=current_organizer.id, login=current_organizer.login,
     )
 
 
+@router.post(
+    "/refresh",
+    response_model=Token,
+    summary="Обновить токены",
+    description="""
+    Обменивает refresh-токен (кука `refresh_token` или поле `refresh_token` в теле)
+    на новую пару токенов. Каждый refresh-токен обменивается один раз: повторное
+    предъявление отзывает все токены этого входа.
+    """,
+    responses={
+        200: {"description": "Новая пара токенов, куки обновлены"},
+        401: {"model": ErrorResponse, "description": "Токен неверный, просрочен или отозван"},
+    },
+)
+async def organizer_refresh(
+    response: Response,
+    session: DbSession,
+    refresh_cookie: Annotated[str | None, Cookie(alias=REFRESH_COOKIE)] = None,
+    refresh_body: Annotated[str | None, Body(alias="refresh_token", embed=True)] = None,
+):
+    token = refresh_cookie or refresh_body
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Не авторизован")
+
+    payload = await rotate_refresh_token(token, "organizer")
+    organizer = await get_organizer_principal(session, int(payload["sub"]))
+    if organizer is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Организатор не найден"
+        )
+    return issue_tokens(response, organizer.id, organizer.login, payload["fam"])
+
+
 @router.post(
     "/logout",
     summary="Выход",
-    description="Удаляет аутентификационные куки",
+    description="Удаляет аутентификационные куки и отзывает токены текущего входа",
     responses={200: {"description": "Успешный выход"}},
 )
-async def organizer_logout(response: Response):
+async def organizer_logout(
+    response: Response,
+    access_token: Annotated[str | None, Cookie()] = None,
+    refresh_cookie: Annotated[str | None, Cookie(alias=REFRESH_COOKIE)] = None,
+):
+    await revoke_token(refresh_cookie or access_token)
     response.delete_cookie(key="access_token")
     response.delete_cookie(key="user_id")
+    response.delete_cookie(key=REFRESH_COOKIE, path=REFRESH_PATH)
     return {"message": "Успешный выход из системы"}
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from config import EVENTS_HEARTBEAT_SECONDS
+from db.crud import get_hack_by_id
+from dependencies import CurrentOrganizer, DbSession
+from server.events import broadcaster, format_sse
+
+from ..schemas.hackathon import ErrorResponse
+
+router = APIRouter(prefix="/organizer/hackathons/{hackathon_id}", tags=["organizer_events"])
+
+
+async def stream_events(request: Request, hackathon_id: int):
+    # подписка создаётся при первом чтении тела: если ответ так и не начали отправлять,
+    # finally не выполнился бы и подписка осталась бы в broadcaster навсегда
+    subscription = broadcaster.subscribe(hackathon_id)
+    event_id = 0
+    try:
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            event = await subscription.get(EVENTS_HEARTBEAT_SECONDS)
+            if subscription.lagged:
+                # часть событий вытеснена: клиенту нужно перечитать команды и аналитику
+                subscription.lagged = False
+                event_id += 1
+                yield format_sse({"type": "resync"}, event_id)
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            event_id += 1
+            yield format_sse(event, event_id)
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+@router.get(
+    "/events",
+    summary="Поток событий хакатона (SSE)",
+    description="""
+    Server-Sent Events с изменениями хакатона вместо опроса `/teams` и `/analytics`.
+
+    **События:** `team_created`, `member_joined`, `invite_accepted`, `team_approved`,
+    `vacancies_changed` (название, описание и свободные роли команды изменились),
+    `participants_assigned` (автораспределение: число назначенных участников и
+    завершённых команд), а также `resync`, если клиент не успевал читать и часть
+    событий была пропущена.
+    """,
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "Поток событий"},
+        403: {"model": ErrorResponse, "description": "Нет прав доступа к хакатону"},
+        404: {"model": ErrorResponse, "description": "Хакатон не найден"},
+    },
+)
+async def hackathon_events(
+    hackathon_id: int,
+    request: Request,
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
+):
+    hackathon = await get_hack_by_id(session, hackathon_id)
+    if not hackathon:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found")
+    if hackathon.organizer_id != current_organizer.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this hackathon"
+        )
+    # сессия больше не нужна: соединение возвращается в пул до начала потока
+    await session.close()
+
+    return StreamingResponse(
+        stream_events(request, hackathon_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,5 @@
+from .handler import router, stream_export
+from .sources import SOURCES, RowSource
+from .writers import WRITERS, ExportWriter
+
+__all__ = ["SOURCES", "WRITERS", "ExportWriter", "RowSource", "router", "stream_export"]
@@ -0,0 +1,96 @@
+from contextlib import aclosing
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from db import db
+from db.crud import get_hack_by_id
+from dependencies import CurrentOrganizer, DbSession
+from utils import streaming_response
+
+from ...schemas.hackathon import ErrorResponse
+from .sources import SOURCES, RowSource
+from .writers import WRITERS, ExportWriter
+
+router = APIRouter(prefix="/organizer/hackathons/{hackathon_id}", tags=["organizer_exports"])
+
+
+async def stream_export(
+    source: RowSource, writer: ExportWriter, hack_id: int, batch_size: int = 1000
+):
+    # своя сессия: генератор живёт дольше обработчика, пока клиент читает ответ.
+    # Сам генератор закрывает streaming_response, а aclosing передаёт закрытие
+    # потоку writer (временный файл XLSX)
+    async with (
+        db.session() as session,
+        aclosing(writer.stream(source.batches(session, hack_id, batch_size))) as chunks,
+    ):
+        async for chunk in chunks:
+            yield chunk  # ruff: ignore[yield-in-context-manager-in-async-generator]
+
+
+def get_writer(source: RowSource, export_format: str) -> ExportWriter:
+    writer_class = WRITERS.get(export_format)
+    if writer_class is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Неизвестный формат, доступны: {', '.join(WRITERS)}",
+        )
+    try:
+        return writer_class(source.columns)
+    except ImportError:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"Формат {export_format} недоступен на этом сервере",
+        ) from None
+
+
+@router.get(
+    "/exports/{dataset}",
+    summary="Экспортировать данные хакатона",
+    description="""
+    Потоково выгружает набор данных хакатона в выбранном формате.
+
+    **Наборы:** `teams`, `participants` (с навыками), `invites`, `analytics` (снимок по командам).
+
+    **Форматы:** `csv`, `ndjson`, `xlsx`, `parquet`.
+    """,
+    responses={
+        200: {"description": "Файл выгрузки"},
+        400: {"model": ErrorResponse, "description": "Неизвестный набор данных или формат"},
+        403: {"model": ErrorResponse, "description": "Нет прав доступа к хакатону"},
+        404: {"model": ErrorResponse, "description": "Хакатон не найден"},
+        501: {"model": ErrorResponse, "description": "Формат не поддерживается сервером"},
+    },
+)
+async def export_dataset(
+    hackathon_id: int,
+    dataset: str,
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
+    export_format: Annotated[str, Query(alias="format", description="Формат файла")] = "csv",
+):
+    hackathon = await get_hack_by_id(session, hackathon_id)
+    if not hackathon:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found")
+    if hackathon.organizer_id != current_organizer.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this hackathon"
+        )
+
+    source = SOURCES.get(dataset)
+    if source is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Неизвестный набор данных, доступны: {', '.join(SOURCES)}",
+        )
+    writer = get_writer(source, export_format)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{dataset}_hackathon_{hackathon_id}_{timestamp}.{writer.extension}"
+    return streaming_response(
+        stream_export(source, writer, hackathon_id),
+        media_type=writer.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
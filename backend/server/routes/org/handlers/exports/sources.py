@@ -0,0 +1,205 @@
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+
+from sqlalchemy import Select, and_, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models import (
+    InviteModel,
+    ParticipantsModel,
+    ProfileModel,
+    ProfileSkillModel,
+    SkillModel,
+    TeamMemberModel,
+    TeamModel,
+    UserModel,
+)
+
+# Типы колонок нужны колоночным форматам (Parquet), остальные пишут значения как есть.
+INT, STR, BOOL, STR_LIST = "int", "str", "bool", "str_list"
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    type: str
+
+
+@dataclass(frozen=True)
+class RowSource:
+    """Набор данных для экспорта: колонки и запрос, возвращающий строки в их порядке."""
+
+    name: str
+    columns: tuple[Column, ...]
+    query: Callable[[int], Select]
+
+    async def batches(
+        self, session: AsyncSession, hack_id: int, batch_size: int = 1000
+    ) -> AsyncIterator[list[tuple]]:
+        # серверный курсор: в памяти одновременно не больше batch_size строк
+        result = await session.stream(self.query(hack_id).execution_options(yield_per=batch_size))
+        async for partition in result.partitions(batch_size):
+            yield [tuple(_plain(value) for value in row) for row in partition]
+
+
+def _plain(value):
+    # Enum -> значение, чтобы все форматы писали одинаковые строки
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value.value if hasattr(value, "value") else value
+
+
+def _teams_query(hack_id: int) -> Select:
+    return (
+        select(
+            TeamModel.id,
+            TeamModel.name,
+            TeamModel.is_completed,
+            TeamMemberModel.role,
+            UserModel.id,
+            UserModel.name,
+            UserModel.telegram_username,
+        )
+        .join(TeamMemberModel, TeamMemberModel.team_id == TeamModel.id)
+        .outerjoin(UserModel, UserModel.id == TeamMemberModel.user_id)
+        .where(TeamModel.hackathon_id == hack_id)
+        .order_by(TeamModel.id, TeamMemberModel.id)
+    )
+
+
+def _participants_query(hack_id: int) -> Select:
+    skills = (
+        select(func.array_agg(aggregate_order_by(SkillModel.name, SkillModel.name)))
+        .join(ProfileSkillModel, ProfileSkillModel.skill_id == SkillModel.id)
+        .where(ProfileSkillModel.profile_id == ProfileModel.id)
+        .correlate(ProfileModel)
+        .scalar_subquery()
+    )
+    team_id = (
+        select(TeamMemberModel.team_id)
+        .join(TeamModel, TeamModel.id == TeamMemberModel.team_id)
+        .where(and_(TeamModel.hackathon_id == hack_id, TeamMemberModel.user_id == UserModel.id))
+        .order_by(TeamMemberModel.id)
+        .limit(1)
+        .correlate(UserModel)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            ParticipantsModel.id,
+            UserModel.id,
+            UserModel.name,
+            UserModel.telegram_username,
+            ProfileModel.role,
+            ProfileModel.about,
+            skills,
+            team_id,
+        )
+        .join(ProfileModel, ProfileModel.id == ParticipantsModel.profile_id)
+        .join(UserModel, UserModel.id == ProfileModel.user_id)
+        .where(ParticipantsModel.hackathon_id == hack_id)
+        .order_by(ParticipantsModel.id)
+    )
+
+
+def _invites_query(hack_id: int) -> Select:
+    return (
+        select(
+            InviteModel.id,
+            InviteModel.type,
+            InviteModel.status,
+            TeamModel.id,
+            TeamModel.name,
+            ParticipantsModel.id,
+            UserModel.id,
+            UserModel.name,
+        )
+        .join(TeamModel, TeamModel.id == InviteModel.team_id)
+        .join(ParticipantsModel, ParticipantsModel.id == InviteModel.participant_id)
+        .join(ProfileModel, ProfileModel.id == ParticipantsModel.profile_id)
+        .join(UserModel, UserModel.id == ProfileModel.user_id)
+        .where(TeamModel.hackathon_id == hack_id)
+        .order_by(InviteModel.id)
+    )
+
+
+def _analytics_query(hack_id: int) -> Select:
+    # снимок по командам: заполненные и пустые слоты, роли участников
+    filled = TeamMemberModel.user_id.is_not(None)
+    return (
+        select(
+            TeamModel.id,
+            TeamModel.name,
+            TeamModel.is_completed,
+            func.count(TeamMemberModel.id).filter(filled),
+            func.count(TeamMemberModel.id).filter(~filled),
+            func.array_agg(aggregate_order_by(TeamMemberModel.role, TeamMemberModel.id)).filter(
+                filled
+            ),
+        )
+        .outerjoin(TeamMemberModel, TeamMemberModel.team_id == TeamModel.id)
+        .where(TeamModel.hackathon_id == hack_id)
+        .group_by(TeamModel.id)
+        .order_by(TeamModel.id)
+    )
+
+
+TEAMS = RowSource(
+    "teams",
+    (
+        Column("team_id", INT),
+        Column("team_name", STR),
+        Column("is_completed", BOOL),
+        Column("role", STR),
+        Column("user_id", INT),
+        Column("user_name", STR),
+        Column("telegram_username", STR),
+    ),
+    _teams_query,
+)
+
+PARTICIPANTS = RowSource(
+    "participants",
+    (
+        Column("participant_id", INT),
+        Column("user_id", INT),
+        Column("user_name", STR),
+        Column("telegram_username", STR),
+        Column("role", STR),
+        Column("about", STR),
+        Column("skills", STR_LIST),
+        Column("team_id", INT),
+    ),
+    _participants_query,
+)
+
+INVITES = RowSource(
+    "invites",
+    (
+        Column("invite_id", INT),
+        Column("type", STR),
+        Column("status", STR),
+        Column("team_id", INT),
+        Column("team_name", STR),
+        Column("participant_id", INT),
+        Column("user_id", INT),
+        Column("user_name", STR),
+    ),
+    _invites_query,
+)
+
+ANALYTICS = RowSource(
+    "analytics",
+    (
+        Column("team_id", INT),
+        Column("team_name", STR),
+        Column("is_completed", BOOL),
+        Column("members", INT),
+        Column("empty_slots", INT),
+        Column("roles", STR_LIST),
+    ),
+    _analytics_query,
+)
+
+SOURCES = {source.name: source for source in (TEAMS, PARTICIPANTS, INVITES, ANALYTICS)}
@@ -0,0 +1,188 @@
+import asyncio
+import csv
+import io
+import json
+import tempfile
+from collections.abc import AsyncIterator
+
+from .sources import BOOL, INT, STR, STR_LIST, Column
+
+# необязательные зависимости: без них соответствующий формат отвечает 501
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+Batches = AsyncIterator[list[tuple]]
+
+# размер куска, которым отдаются готовые файлы (XLSX)
+CHUNK_SIZE = 64 * 1024
+
+
+class ExportWriter:
+    """Превращает пачки строк в поток байтов своего формата."""
+
+    format: str
+    media_type: str
+    extension: str
+
+    def __init__(self, columns: tuple[Column, ...]):
+        self.columns = columns
+
+    def stream(self, batches: Batches) -> AsyncIterator[bytes]:
+        raise NotImplementedError
+
+
+def _flat(value):
+    # списки (навыки, роли) в текстовых форматах пишем через запятую
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value)
+    return value
+
+
+class CsvWriter(ExportWriter):
+    format = "csv"
+    media_type = "text/csv"
+    extension = "csv"
+
+    async def stream(self, batches: Batches) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([column.name for column in self.columns])
+        yield buffer.getvalue().encode()
+
+        async for rows in batches:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_flat(value) for value in row] for row in rows)
+            yield buffer.getvalue().encode()
+
+
+class NdjsonWriter(ExportWriter):
+    format = "ndjson"
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    async def stream(self, batches: Batches) -> AsyncIterator[bytes]:
+        names = [column.name for column in self.columns]
+        async for rows in batches:
+            yield "".join(
+                json.dumps(dict(zip(names, row, strict=True)), ensure_ascii=False, default=str)
+                + "\n"
+                for row in rows
+            ).encode()
+
+
+class XlsxWriter(ExportWriter):
+    format = "xlsx"
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    extension = "xlsx"
+
+    def __init__(self, columns: tuple[Column, ...]):
+        super().__init__(columns)
+        if openpyxl is None:
+            raise ImportError("openpyxl не установлен")
+
+    @staticmethod
+    def _append(sheet, rows: list[tuple]) -> None:
+        for row in rows:
+            sheet.append([_flat(value) for value in row])
+
+    async def stream(self, batches: Batches) -> AsyncIterator[bytes]:
+        # write_only держит в памяти только текущую строку; zip-контейнер собирается
+        # в конце, поэтому файл копится во временном файле, а не в памяти.
+        # Сериализация и сжатие идут в потоке, чтобы не блокировать event loop
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append([column.name for column in self.columns])
+        async for rows in batches:
+            await asyncio.to_thread(self._append, sheet, rows)
+
+        with tempfile.SpooledTemporaryFile(max_size=8 * CHUNK_SIZE) as file:
+            await asyncio.to_thread(workbook.save, file)
+            file.seek(0)
+            # недочитанный поток закрывают вызывающие (aclosing), а с ним и файл
+            while chunk := await asyncio.to_thread(file.read, CHUNK_SIZE):
+                yield chunk  # ruff: ignore[yield-in-context-manager-in-async-generator]
+
+
+class _ChunkSink(io.RawIOBase):
+    # файловый объект для pyarrow: отдаёт записанное по кускам и помнит позицию,
+    # чтобы смещения в футере Parquet оставались верными
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetWriter(ExportWriter):
+    format = "parquet"
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self, columns: tuple[Column, ...], row_group_size: int = 50_000):
+        super().__init__(columns)
+        if pyarrow is None:
+            raise ImportError("pyarrow не установлен")
+        self.row_group_size = row_group_size
+        types = {
+            INT: pyarrow.int64(),
+            STR: pyarrow.string(),
+            BOOL: pyarrow.bool_(),
+            STR_LIST: pyarrow.list_(pyarrow.string()),
+        }
+        self.schema = pyarrow.schema([(column.name, types[column.type]) for column in columns])
+
+    def _table(self, rows: list[tuple]):
+        columns = list(zip(*rows, strict=True)) if rows else [()] * len(self.columns)
+        return pyarrow.Table.from_arrays(
+            [
+                pyarrow.array(values, type=field.type)
+                for values, field in zip(columns, self.schema, strict=True)
+            ],
+            schema=self.schema,
+        )
+
+    def _write(self, writer, rows: list[tuple]) -> None:
+        writer.write_table(self._table(rows))
+
+    async def stream(self, batches: Batches) -> AsyncIterator[bytes]:
+        # сборка и сжатие row group — в потоке, чтобы не блокировать event loop
+        sink = _ChunkSink()
+        writer = pyarrow.parquet.ParquetWriter(sink, self.schema)
+        pending: list[tuple] = []
+        async for rows in batches:
+            pending.extend(rows)
+            if len(pending) >= self.row_group_size:
+                await asyncio.to_thread(self._write, writer, pending)
+                pending = []
+                yield sink.drain()
+        if pending:
+            await asyncio.to_thread(self._write, writer, pending)
+        await asyncio.to_thread(writer.close)
+        yield sink.drain()
+
+
+WRITERS: dict[str, type[ExportWriter]] = {
+    writer.format: writer for writer in (CsvWriter, NdjsonWriter, XlsxWriter, ParquetWriter)
+}
@@ -8,9 +8,9 @@ from fastapi.responses import FileResponse
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from db import get_session
-from db.crud import get_hack_by_id
-from db.models import HackathonModel, OrganizerModel
-from dependencies import get_current_organizer_cookie
+from db.crud import get_hack_by_id, invalidate_hack
+from db.models import HackathonModel
+from dependencies import CurrentOrganizer, DbSession
 
 from ..schemas.hackathon import (
     ErrorResponse,
@@ -39,8 +39,8 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
     },
 )
 async def get_my_hackathons(
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
 ):
     result = await session.execute(
         select(HackathonModel)
@@ -65,8 +65,8 @@ async def get_my_hackathons(
 )
 async def create_hackathon(
     hackathon_data: HackathonCreate,
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
 ):
     """Создание хакатона через JSON (без фото)"""
     if hackathon_data.start_date >= hackathon_data.end_date:
@@ -88,6 +88,7 @@ async def create_hackathon(
     session.add(hackathon)
     await session.commit()
     await session.refresh(hackathon)
+    await invalidate_hack(hackathon.id)
 
     return hackathon
 
@@ -118,6 +119,8 @@ async def create_hackathon(
     },
 )
 async def create_hackathon_with_photo(
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
     name: str = Form(..., description="Название хакатона"),
     description: str = Form(..., description="Описание хакатона"),
     start_date: date = Form(..., description="Дата начала в формате YYYY-MM-DD"),
@@ -127,8 +130,6 @@ async def create_hackathon_with_photo(
     min_team_size: int = Form(2, ge=1, description="Минимальный размер команды"),
     max_team_size: int = Form(5, ge=1, description="Максимальный размер команды"),
     photo: Optional[UploadFile] = File(None, description="Фото хакатона (необязательно)"),
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
 ):
     """Создание хакатона с возможностью загрузки фото через форму"""
 
@@ -174,6 +175,7 @@ async def create_hackathon_with_photo(
         hackathon.photo_url = f"/uploads/hackathon_photos/{filename}"
         await session.commit()
 
+    await invalidate_hack(hackathon.id)
     return hackathon
 
 
@@ -190,8 +192,8 @@ async def create_hackathon_with_photo(
 )
 async def get_hackathon(
     hackathon_id: int,
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
 ):
     hackathon = await get_hack_by_id(session, hackathon_id)
 
@@ -235,8 +237,8 @@ async def get_hackathon(
 async def update_hackathon(
     hackathon_id: int,
     hackathon_data: HackathonUpdate,
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
 ):
     hackathon = await get_hack_by_id(session, hackathon_id)
 
@@ -272,6 +274,7 @@ async def update_hackathon(
             setattr(hackathon, field, value)
 
     await session.commit()
+    await invalidate_hack(hackathon_id)
     await session.refresh(hackathon)
 
     return hackathon
@@ -290,8 +293,8 @@ async def update_hackathon(
 )
 async def delete_hackathon(
     hackathon_id: int,
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
 ):
     hackathon = await get_hack_by_id(session, hackathon_id)
 
@@ -311,6 +314,7 @@ async def delete_hackathon(
 
     await session.delete(hackathon)
     await session.commit()
+    await invalidate_hack(hackathon_id)
 
     return None
 
@@ -334,9 +338,9 @@ async def delete_hackathon(
 )
 async def upload_hackathon_photo(
     hackathon_id: int,
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
     photo: UploadFile = File(..., description="Файл изображения для хакатона"),
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
 ):
     hackathon = await get_hack_by_id(session, hackathon_id)
 
@@ -372,6 +376,7 @@ async def upload_hackathon_photo(
     # Обновляем путь в БД
     hackathon.photo_url = f"/uploads/hackathon_photos/{filename}"
     await session.commit()
+    await invalidate_hack(hackathon_id)
 
     return PhotoUploadResponse(photo_url=hackathon.photo_url, message="Фото успешно загружено")
 
@@ -434,8 +439,8 @@ async def get_hackathon_photo(hackathon_id: int, session: AsyncSession = Depends
 )
 async def delete_hackathon_photo(
     hackathon_id: int,
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
 ):
     hackathon = await get_hack_by_id(session, hackathon_id)
 
@@ -460,5 +465,6 @@ async def delete_hackathon_photo(
     # Очищаем поле в БД
     hackathon.photo_url = None
     await session.commit()
+    await invalidate_hack(hackathon_id)
 
     return None
@@ -0,0 +1,221 @@
+import asyncio
+import os
+from contextlib import aclosing
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import JOBS_DIR
+from db import db
+from db.crud import (
+    complete_team,
+    create_job,
+    get_hack_by_id,
+    get_job_by_id,
+    get_team_members_by_team_id,
+    invalidate_team_rosters,
+    notify_event,
+)
+from db.models import JobModel, JobStatusEnum, TeamModel
+from dependencies import CurrentOrganizer, DbSession, OrganizerPrincipal
+from jobs import Progress, runner
+from jobs.maintenance import remove_result
+
+from ..schemas.hackathon import ErrorResponse
+from ..schemas.job import ApproveTeamsParams, JobCreate, JobResponse
+from .exports import SOURCES, WRITERS
+
+router = APIRouter(prefix="/organizer/jobs", tags=["organizer_jobs"])
+
+
+@runner.register("export")
+async def run_export(job: JobModel, progress: Progress) -> str:
+    source = SOURCES[job.params["dataset"]]
+    writer = WRITERS[job.params["format"]](source.columns)
+    await asyncio.to_thread(os.makedirs, JOBS_DIR, exist_ok=True)
+    path = os.path.join(JOBS_DIR, f"job_{job.id}_{source.name}.{writer.extension}")
+
+    exported = 0
+
+    async def counted(batches):
+        nonlocal exported
+        async for rows in batches:
+            yield rows
+            exported += len(rows)
+            await progress(exported)
+
+    # запись на диск — в потоке, чтобы медленный диск не останавливал event loop
+    file = await asyncio.to_thread(open, path, "wb")
+    try:
+        async with db.session() as session:
+            # aclosing: при ошибке записи поток writer закрывается сразу (временный файл XLSX)
+            batches = counted(source.batches(session, job.hackathon_id))
+            async with aclosing(writer.stream(batches)) as chunks:
+                async for chunk in chunks:
+                    await asyncio.to_thread(file.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(file.close)
+        await remove_result(path)
+        raise
+    await asyncio.to_thread(file.close)
+    return path
+
+
+@runner.register("approve_teams")
+async def run_approve_teams(job: JobModel, progress: Progress) -> None:
+    params = ApproveTeamsParams.model_validate(job.params)
+    approve = params.approve
+    async with db.session() as session:
+        q = select(TeamModel).where(TeamModel.hackathon_id == job.hackathon_id)
+        if params.team_ids is not None:
+            q = q.where(TeamModel.id.in_(params.team_ids))
+        teams = (await session.execute(q.order_by(TeamModel.id))).scalars().all()
+
+        # по транзакции на команду: блокировки держатся недолго, прогресс честный
+        for done, team in enumerate(teams, start=1):
+            members = await get_team_members_by_team_id(session, team.id)
+            for member in members:
+                member.approved = approve
+                session.add(member)
+            if approve:
+                await complete_team(session, job.hackathon_id, team.id)
+            await notify_event(
+                session, job.hackathon_id, "team_approved", team_id=team.id, approved=approve
+            )
+            await session.commit()
+            await progress(done, len(teams))
+
+    await invalidate_team_rosters(job.hackathon_id)
+
+
+def job_response(job: JobModel) -> JobResponse:
+    download_url = None
+    if job.status == JobStatusEnum.DONE and job.result_path:
+        download_url = f"/organizer/jobs/{job.id}/download"
+    return JobResponse(
+        id=job.id,
+        kind=job.kind,
+        status=job.status.value,
+        hackathon_id=job.hackathon_id,
+        params=job.params,
+        progress=job.progress,
+        total=job.total,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        download_url=download_url,
+    )
+
+
+async def get_own_job(
+    session: AsyncSession, job_id: int, organizer: OrganizerPrincipal
+) -> JobModel:
+    job = await get_job_by_id(session, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if job.organizer_id != organizer.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this job"
+        )
+    return job
+
+
+@router.post(
+    "",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Поставить фоновую задачу",
+    description="""
+    Ставит в очередь выгрузку (`export`) или массовое одобрение команд (`approve_teams`).
+    Статус и прогресс — `GET /organizer/jobs/{id}`, результат выгрузки — `/download`.
+    """,
+    responses={
+        202: {"description": "Задача поставлена в очередь"},
+        400: {"model": ErrorResponse, "description": "Некорректные параметры задачи"},
+        403: {"model": ErrorResponse, "description": "Нет прав доступа к хакатону"},
+        404: {"model": ErrorResponse, "description": "Хакатон не найден"},
+        501: {"model": ErrorResponse, "description": "Формат не поддерживается сервером"},
+    },
+)
+async def submit_job(
+    payload: JobCreate,
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
+):
+    hackathon = await get_hack_by_id(session, payload.hackathon_id)
+    if not hackathon:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found")
+    if hackathon.organizer_id != current_organizer.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this hackathon"
+        )
+
+    params = dict(payload.params)
+    if payload.kind == "export":
+        params.setdefault("format", "csv")
+        if params.get("dataset") not in SOURCES or params["format"] not in WRITERS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Наборы данных: {', '.join(SOURCES)}; форматы: {', '.join(WRITERS)}",
+            )
+        try:
+            WRITERS[params["format"]](SOURCES[params["dataset"]].columns)
+        except ImportError:
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail=f"Формат {params['format']} недоступен на этом сервере",
+            ) from None
+
+    job = await create_job(
+        session, payload.kind, current_organizer.id, payload.hackathon_id, params
+    )
+    runner.notify()
+    return job_response(job)
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobResponse,
+    summary="Статус фоновой задачи",
+    responses={
+        200: {"description": "Статус и прогресс задачи"},
+        403: {"model": ErrorResponse, "description": "Задача другого организатора"},
+        404: {"model": ErrorResponse, "description": "Задача не найдена"},
+    },
+)
+async def get_job(
+    job_id: int,
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
+):
+    return job_response(await get_own_job(session, job_id, current_organizer))
+
+
+@router.get(
+    "/{job_id}/download",
+    summary="Скачать результат фоновой задачи",
+    responses={
+        200: {"description": "Файл выгрузки"},
+        403: {"model": ErrorResponse, "description": "Задача другого организатора"},
+        404: {"model": ErrorResponse, "description": "Задача или файл не найдены"},
+        409: {"model": ErrorResponse, "description": "Задача ещё не завершена"},
+    },
+)
+async def download_job_result(
+    job_id: int,
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
+):
+    job = await get_own_job(session, job_id, current_organizer)
+    if job.status != JobStatusEnum.DONE:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job is not finished")
+    if not job.result_path or not await asyncio.to_thread(os.path.exists, job.result_path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Result file not found")
+
+    writer = WRITERS.get(job.params.get("format"))
+    media_type = writer.media_type if writer else "application/octet-stream"
+    return FileResponse(
+        job.result_path, media_type=media_type, filename=os.path.basename(job.result_path)
+    )
@@ -1,27 +1,31 @@
+import asyncio
 import csv
-import tempfile
-from datetime import date, datetime
+from datetime import UTC, date, datetime, timedelta
 from io import StringIO
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse, StreamingResponse
+from typing import Annotated, List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, status
 from sqlalchemy import and_, select
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from db import get_session
+from db import db
 from db.crud import (
-    count_teams_for_hack,
+    apply_team_assignments,
+    bump_hackathon_stats,
+    complete_team,
     get_hack_by_id,
-    get_profile_by_user_id,
-    get_profile_skill_ids,
-    get_skills_by_ids,
+    get_hackathon_stats,
+    get_hackathon_stats_history,
+    get_hackathon_team_rosters,
+    get_participant_directory,
     get_team_by_id,
     get_team_members_by_team_id,
     get_users_by_ids,
+    invalidate_team_rosters,
+    notify_event,
+    role_key,
+    stream_team_member_rows,
 )
 from db.models import (
     HackathonModel,
-    OrganizerModel,
     ProfileModel,
     RoleType,
     SkillModel,
@@ -29,11 +33,17 @@ from db.models import (
     TeamModel,
     UserModel,
 )
-from dependencies import get_current_organizer_cookie
+from dependencies import CurrentOrganizer, DbSession
+from matching import build_index, skill_indexes, solve_assignment, usable_slots
+from utils import streaming_response
 
 from ..schemas.hackathon import (
+    AnalyticsHistoryResponse,
+    AnalyticsPoint,
     AnalyticsResponse,
     AssignParticipantResponse,
+    AutoAssignment,
+    AutoAssignResponse,
     ErrorResponse,
     ParticipantResponse,
     TeamApproveResponse,
@@ -56,8 +66,8 @@ router = APIRouter(prefix="/organizer/hackathons/{hackathon_id}", tags=["organiz
 )
 async def get_hackathon_teams(
     hackathon_id: int,
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
 ):
     hackathon = await get_hack_by_id(session, hackathon_id)
     if not hackathon:
@@ -66,38 +76,7 @@ async def get_hackathon_teams(
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this hackathon"
         )
-    result = await session.execute(select(TeamModel).where(TeamModel.hackathon_id == hackathon_id))
-    teams = result.scalars().all()
-    response_teams = []
-    for team in teams:
-        members = await get_team_members_by_team_id(session, team.id)
-        member_responses = []
-        for member in members:
-            user_info = {}
-            if member.user_id:
-                user_result = await session.execute(
-                    select(UserModel).where(UserModel.id == member.user_id)
-                )
-                user = user_result.scalar_one_or_none()
-                if user:
-                    user_info = {"user_name": user.name, "user_avatar": user.avatar_url}
-            member_response = {
-                "id": member.id,
-                "user_id": member.user_id,
-                "role": member.role.value if hasattr(member.role, "value") else str(member.role),
-                "approved": member.approved,
-                **user_info,
-            }
-            member_responses.append(member_response)
-        team_response = {
-            "id": team.id,
-            "name": team.name,
-            "is_completed": team.is_completed,
-            "hackathon_id": team.hackathon_id,
-            "members": member_responses,
-        }
-        response_teams.append(team_response)
-    return response_teams
+    return await get_hackathon_team_rosters(session, hackathon_id)
 
 
 @router.get(
@@ -114,9 +93,13 @@ async def get_hackathon_teams(
 )
 async def get_hackathon_participants(
     hackathon_id: int,
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
     team_status: Optional[str] = None,
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
+    after: Annotated[
+        int | None, Query(description="user_id последнего участника предыдущей страницы")
+    ] = None,
+    limit: Annotated[int | None, Query(ge=1, le=500, description="Размер страницы")] = None,
 ):
     hackathon = await get_hack_by_id(session, hackathon_id)
     if not hackathon:
@@ -125,68 +108,9 @@ async def get_hackathon_participants(
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this hackathon"
         )
-    result = await session.execute(
-        select(TeamMemberModel, UserModel, TeamModel)
-        .join(UserModel, TeamMemberModel.user_id == UserModel.id)
-        .join(TeamModel, TeamMemberModel.team_id == TeamModel.id)
-        .where(TeamModel.hackathon_id == hackathon_id)
-        .where(TeamMemberModel.user_id.is_not(None))
+    return await get_participant_directory(
+        session, hackathon_id, team_status=team_status, after_user_id=after, limit=limit
     )
-    rows = result.all()
-    participants_with_teams = {}
-    for member, user, team in rows:
-        if user.id not in participants_with_teams:
-            participants_with_teams[user.id] = {"user": user, "team": team, "role": member.role}
-    participants = []
-    for user_id, data in participants_with_teams.items():
-        user = data["user"]
-        profile = await get_profile_by_user_id(session, user.id)
-        skills = []
-        if profile:
-            skill_ids = await get_profile_skill_ids(session, profile.id)
-            skill_objs = await get_skills_by_ids(session, skill_ids)
-            skills = [skill.name for skill in skill_objs]
-        participant = ParticipantResponse(
-            user_id=user.id,
-            name=user.name,
-            avatar_url=user.avatar_url,
-            has_team=True,
-            team_name=data["team"].name,
-            role=data["role"].value if hasattr(data["role"], "value") else str(data["role"]),
-            skills=skills,
-        )
-        participants.append(participant)
-    if team_status == "without_team" or team_status is None:
-        user_ids_in_teams = list(participants_with_teams.keys())
-        query = select(UserModel)
-        if user_ids_in_teams:
-            query = query.where(UserModel.id.notin_(user_ids_in_teams))
-        result = await session.execute(query)
-        users_without_teams = result.scalars().all()
-        for user in users_without_teams:
-            if team_status == "with_team":
-                continue
-            profile = await get_profile_by_user_id(session, user.id)
-            skills = []
-            if profile:
-                skill_ids = await get_profile_skill_ids(session, profile.id)
-                skill_objs = await get_skills_by_ids(session, skill_ids)
-                skills = [skill.name for skill in skill_objs]
-            participant = ParticipantResponse(
-                user_id=user.id,
-                name=user.name,
-                avatar_url=user.avatar_url,
-                has_team=False,
-                team_name=None,
-                role=None,
-                skills=skills,
-            )
-            participants.append(participant)
-    if team_status == "with_team":
-        participants = [p for p in participants if p.has_team]
-    elif team_status == "without_team":
-        participants = [p for p in participants if not p.has_team]
-    return participants
 
 
 @router.get(
@@ -202,8 +126,8 @@ async def get_hackathon_participants(
 )
 async def get_hackathon_analytics(
     hackathon_id: int,
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
 ):
     hackathon = await get_hack_by_id(session, hackathon_id)
     if not hackathon:
@@ -212,29 +136,11 @@ async def get_hackathon_analytics(
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this hackathon"
         )
-    teams_count = await count_teams_for_hack(session, hackathon_id)
-    participants_count_result = await session.execute(
-        select(TeamMemberModel)
-        .join(TeamModel, TeamMemberModel.team_id == TeamModel.id)
-        .where(and_(TeamModel.hackathon_id == hackathon_id, TeamMemberModel.user_id.is_not(None)))
-    )
-    participants_count = len(participants_count_result.scalars().all())
-    incomplete_teams_result = await session.execute(
-        select(TeamModel).where(
-            and_(TeamModel.hackathon_id == hackathon_id, TeamModel.is_completed == False)
-        )
-    )
-    incomplete_teams = len(incomplete_teams_result.scalars().all())
-    roles_result = await session.execute(
-        select(TeamMemberModel.role, UserModel.name)
-        .join(UserModel, TeamMemberModel.user_id == UserModel.id)
-        .join(TeamModel, TeamMemberModel.team_id == TeamModel.id)
-        .where(and_(TeamModel.hackathon_id == hackathon_id, TeamMemberModel.user_id.is_not(None)))
-    )
-    role_distribution = {}
-    for role, name in roles_result.all():
-        role_name = role.value if hasattr(role, "value") else str(role)
-        role_distribution[role_name] = role_distribution.get(role_name, 0) + 1
+    counts = await get_hackathon_stats(session, hackathon_id)
+    teams_count = counts["total_teams"]
+    participants_count = counts["total_participants"]
+    incomplete_teams = counts["incomplete_teams"]
+    role_distribution = counts["role_distribution"]
     today = date.today()
     registration_status = "open" if hackathon.start_date > today else "closed"
     days_until_start = (hackathon.start_date - today).days if hackathon.start_date > today else 0
@@ -263,6 +169,53 @@ async def get_hackathon_analytics(
     return analytics
 
 
+@router.get(
+    "/analytics/history",
+    response_model=AnalyticsHistoryResponse,
+    summary="История аналитики хакатона",
+    description="""
+    Значения счётчиков (команды, незавершённые команды, участники) во времени.
+
+    Точка на каждый интервал `step` — последнее известное значение в нём. Минутные снимки
+    хранятся сутки, часовые — 30 дней, дальше остаются дневные.
+    По умолчанию — последние 7 дней с шагом в час.
+    """,
+    responses={
+        200: {"description": "История успешно получена"},
+        403: {"model": ErrorResponse, "description": "Нет прав доступа к хакатону"},
+        404: {"model": ErrorResponse, "description": "Хакатон не найден"},
+    },
+)
+async def get_hackathon_analytics_history(
+    hackathon_id: int,
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
+    from_: Annotated[datetime | None, Query(alias="from", description="Начало интервала")] = None,
+    to: Annotated[datetime | None, Query(description="Конец интервала")] = None,
+    step: Annotated[Literal["minute", "hour", "day"], Query(description="Шаг точек")] = "hour",
+):
+    hackathon = await get_hack_by_id(session, hackathon_id)
+    if not hackathon:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found")
+    if hackathon.organizer_id != current_organizer.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this hackathon"
+        )
+    # время без часового пояса считаем UTC
+    to = to.replace(tzinfo=to.tzinfo or UTC) if to else datetime.now(UTC)
+    from_ = from_.replace(tzinfo=from_.tzinfo or UTC) if from_ else to - timedelta(days=7)
+    if from_ > to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="'from' must not be after 'to'"
+        )
+    points = await get_hackathon_stats_history(session, hackathon_id, from_, to, step)
+    return AnalyticsHistoryResponse(
+        hackathon_id=hackathon_id,
+        step=step,
+        points=[AnalyticsPoint(**point) for point in points],
+    )
+
+
 @router.get(
     "/export/csv",
     summary="Экспортировать команды в CSV (скачать файл)",
@@ -275,8 +228,8 @@ async def get_hackathon_analytics(
 )
 async def export_teams_csv_download(
     hackathon_id: int,
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
 ):
     hackathon = await get_hack_by_id(session, hackathon_id)
     if not hackathon:
@@ -285,33 +238,38 @@ async def export_teams_csv_download(
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this hackathon"
         )
-    result = await session.execute(
-        select(TeamModel, TeamMemberModel, UserModel)
-        .join(TeamMemberModel, TeamModel.id == TeamMemberModel.team_id)
-        .join(UserModel, TeamMemberModel.user_id == UserModel.id)
-        .where(TeamModel.hackathon_id == hackathon_id)
-        .where(TeamMemberModel.user_id.is_not(None))
-        .order_by(TeamModel.id, UserModel.name)
+    filename = f"teams_hackathon_{hackathon_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return streaming_response(
+        _stream_teams_csv(hackathon.id, hackathon.name),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
-    rows = result.all()
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".csv", delete=False, encoding="utf-8"
-    ) as tmp_file:
-        writer = csv.writer(tmp_file)
-        writer.writerow(
-            [
-                "ID команды",
-                "Название команды",
-                "Завершена",
-                "ID участника",
-                "Имя участника",
-                "Роль",
-                "Одобрен",
-                "ID хакатона",
-                "Название хакатона",
-            ]
-        )
-        for team, member, user in rows:
+
+
+async def _stream_teams_csv(hackathon_id: int, hackathon_name: str, chunk_rows: int = 500):
+    # своя сессия: генератор живёт дольше обработчика, пока клиент читает ответ
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(
+        [
+            "ID команды",
+            "Название команды",
+            "Завершена",
+            "ID участника",
+            "Имя участника",
+            "Роль",
+            "Одобрен",
+            "ID хакатона",
+            "Название хакатона",
+        ]
+    )
+    yield buffer.getvalue()
+
+    async with db.session() as session:
+        rows_in_buffer = 0
+        buffer.seek(0)
+        buffer.truncate()
+        async for team, member, user in stream_team_member_rows(session, hackathon_id):
             writer.writerow(
                 [
                     team.id,
@@ -321,12 +279,19 @@ async def export_teams_csv_download(
                     user.name,
                     member.role.value if hasattr(member.role, "value") else str(member.role),
                     "Да" if member.approved else "Нет",
-                    hackathon.id,
-                    hackathon.name,
+                    hackathon_id,
+                    hackathon_name,
                 ]
             )
-    filename = f"teams_hackathon_{hackathon_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    return FileResponse(tmp_file.name, media_type="text/csv", filename=filename)
+            rows_in_buffer += 1
+            if rows_in_buffer >= chunk_rows:
+                # генератор закрывает streaming_response, в том числе при обрыве
+                yield buffer.getvalue()  # ruff: ignore[yield-in-context-manager-in-async-generator]
+                buffer.seek(0)
+                buffer.truncate()
+                rows_in_buffer = 0
+        if rows_in_buffer:
+            yield buffer.getvalue()  # ruff: ignore[yield-in-context-manager-in-async-generator]
 
 
 @router.post(
@@ -344,9 +309,9 @@ async def export_teams_csv_download(
 async def approve_team(
     hackathon_id: int,
     team_id: int,
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
     approve: bool = True,
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
 ):
     hackathon = await get_hack_by_id(session, hackathon_id)
     if not hackathon:
@@ -367,9 +332,10 @@ async def approve_team(
         member.approved = approve
         session.add(member)
     if approve:
-        team.is_completed = True
-        session.add(team)
+        await complete_team(session, hackathon_id, team_id)
+    await notify_event(session, hackathon_id, "team_approved", team_id=team_id, approved=approve)
     await session.commit()
+    await invalidate_team_rosters(hackathon_id)
     response_message = "approved" if approve else "rejected"
     approved_members = sum(1 for member in members if member.approved)
     response = TeamApproveResponse(
@@ -406,8 +372,8 @@ async def assign_participant_to_team(
     user_id: int,
     team_id: int,
     role: str,
-    session: AsyncSession = Depends(get_session),
-    current_organizer: OrganizerModel = Depends(get_current_organizer_cookie),
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
 ):
     hackathon = await get_hack_by_id(session, hackathon_id)
     if not hackathon:
@@ -455,10 +421,21 @@ async def assign_participant_to_team(
         )
     new_member = TeamMemberModel(team_id=team_id, user_id=user_id, role=role_enum, approved=True)
     session.add(new_member)
+    await bump_hackathon_stats(session, hackathon_id, roles={role_key(role_enum): 1})
+    team_completed = bool(team.is_completed)
     if real_members_count + 1 >= hackathon.min_team_size:
-        team.is_completed = True
-        session.add(team)
+        await complete_team(session, hackathon_id, team_id)
+        team_completed = True
+    await notify_event(
+        session,
+        hackathon_id,
+        "member_joined",
+        team_id=team_id,
+        user_id=user_id,
+        role=role_key(role_enum),
+    )
     await session.commit()
+    await invalidate_team_rosters(hackathon_id)
     response = AssignParticipantResponse(
         success=True,
         message=f"User '{user.name}' has been assigned to team '{team.name}' as {role}",
@@ -467,8 +444,85 @@ async def assign_participant_to_team(
         user_id=user_id,
         user_name=user.name,
         role=role,
-        team_completed=team.is_completed,
+        team_completed=team_completed,
         team_size_before=real_members_count,
         team_size_after=real_members_count + 1,
     )
     return response
+
+
+@router.post(
+    "/participants/auto-assign",
+    response_model=AutoAssignResponse,
+    summary="Автоматически распределить участников без команды",
+    description="""
+    Подбирает участникам без команды свободные места их роли с учётом навыков,
+    max_team_size и max_teams. По умолчанию (`dry_run=true`) только показывает план;
+    с `dry_run=false` пересчитывает его по текущим составам и применяет одной транзакцией.
+    """,
+    responses={
+        200: {"description": "План распределения (и результат применения)"},
+        403: {"model": ErrorResponse, "description": "Нет прав доступа к хакатону"},
+        404: {"model": ErrorResponse, "description": "Хакатон не найден"},
+        409: {"model": ErrorResponse, "description": "Составы изменились во время применения"},
+    },
+)
+async def auto_assign_participants(
+    hackathon_id: int,
+    session: DbSession,
+    current_organizer: CurrentOrganizer,
+    dry_run: bool = True,
+):
+    hackathon = await get_hack_by_id(session, hackathon_id)
+    if not hackathon:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found")
+    if hackathon.organizer_id != current_organizer.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to access this hackathon"
+        )
+
+    # превью берёт закэшированный индекс, применение — свежий
+    index = await skill_indexes.get(hackathon_id) if dry_run else await build_index(hackathon_id)
+    # решение занимает процессор до секунд на больших хакатонах — вне event loop
+    assignments = await asyncio.to_thread(
+        solve_assignment,
+        index,
+        hackathon.min_team_size,
+        hackathon.max_team_size,
+        hackathon.max_teams,
+    )
+
+    completed_teams = None
+    if not dry_run and assignments:
+        completed_teams = await apply_team_assignments(
+            session,
+            hackathon_id,
+            [(item.member_id, item.user_id) for item in assignments],
+            hackathon.min_team_size,
+        )
+        if completed_teams is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Team rosters changed while assigning, please retry",
+            )
+
+    open_slots = len(usable_slots(index, hackathon.max_team_size, hackathon.max_teams))
+    return AutoAssignResponse(
+        dry_run=dry_run,
+        assigned=len(assignments),
+        unassigned_participants=int((~index.has_team).sum()) - len(assignments),
+        open_slots_left=open_slots - len(assignments),
+        completed_teams=completed_teams,
+        assignments=[
+            AutoAssignment(
+                participant_id=item.participant_id,
+                user_id=item.user_id,
+                team_id=item.team_id,
+                team_name=index.team_names[index.team_row(item.team_id)],
+                member_id=item.member_id,
+                role=role_key(item.role),
+                score=item.score,
+            )
+            for item in assignments
+        ],
+    )
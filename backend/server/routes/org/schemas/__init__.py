@@ -17,13 +17,23 @@ from .hackathon import (
     TeamResponse,
     ParticipantResponse,
     AnalyticsResponse,
+    AnalyticsPoint,
+    AnalyticsHistoryResponse,
     TeamApproveResponse,
     AssignParticipantResponse,
+    AutoAssignment,
+    AutoAssignResponse,
     CSVExportResponse,
     PhotoUploadResponse,
     ErrorResponse
 )
 
+from .job import (
+    ApproveTeamsParams,
+    JobCreate,
+    JobResponse
+)
+
 __all__ = [
     "OrganizerBase",
     "OrganizerCreate",
@@ -40,9 +50,16 @@ __all__ = [
     "TeamResponse",
     "ParticipantResponse",
     "AnalyticsResponse",
+    "AnalyticsPoint",
+    "AnalyticsHistoryResponse",
     "TeamApproveResponse",
     "AssignParticipantResponse",
+    "AutoAssignment",
+    "AutoAssignResponse",
     "CSVExportResponse",
     "PhotoUploadResponse",
-    "ErrorResponse"
+    "ErrorResponse",
+    "ApproveTeamsParams",
+    "JobCreate",
+    "JobResponse"
 ]
\ No newline at end of file
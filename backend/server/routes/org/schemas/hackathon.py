@@ -117,6 +117,19 @@ class AnalyticsResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AnalyticsPoint(BaseModel):
+    at: datetime
+    total_teams: int
+    incomplete_teams: int
+    total_participants: int
+
+
+class AnalyticsHistoryResponse(BaseModel):
+    hackathon_id: int
+    step: str
+    points: list[AnalyticsPoint]
+
+
 class TeamApproveResponse(BaseModel):
     team_id: int
     approved: bool
@@ -143,6 +156,25 @@ class AssignParticipantResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AutoAssignment(BaseModel):
+    participant_id: int
+    user_id: int
+    team_id: int
+    team_name: str
+    member_id: int
+    role: str
+    score: float
+
+
+class AutoAssignResponse(BaseModel):
+    dry_run: bool
+    assigned: int
+    unassigned_participants: int
+    open_slots_left: int
+    completed_teams: int | None = None
+    assignments: list[AutoAssignment]
+
+
 class CSVExportResponse(BaseModel):
     filename: str
     content_type: str = "text/csv"
@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationInfo, field_validator
+
+
+class ApproveTeamsParams(BaseModel):
+    team_ids: list[int] | None = Field(None, description="Команды; null — все команды хакатона")
+    approve: bool = True
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class JobCreate(BaseModel):
+    kind: Literal["export", "approve_teams"] = Field(..., description="Тип задачи")
+    hackathon_id: int
+    params: dict = Field(
+        default_factory=dict,
+        description=(
+            'export: {"dataset": "participants", "format": "xlsx"}; '
+            'approve_teams: {"team_ids": [1, 2] или null для всех, "approve": true}'
+        ),
+    )
+
+    @field_validator("params")
+    @classmethod
+    def check_params(cls, params: dict, info: ValidationInfo) -> dict:
+        # ошибка в параметрах — 422 при постановке, а не падение задачи в воркере
+        if info.data.get("kind") == "approve_teams":
+            return ApproveTeamsParams.model_validate(params).model_dump()
+        return params
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    hackathon_id: int
+    params: dict
+    progress: int
+    total: int | None = None
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+    download_url: str | None = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,12 +1,21 @@
 import time
 
 import jwt
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import JWT_EXPIRE_MINUTES, SECRET_KEY, TG_BOT_TOKEN
 from db import crud, get_session
+from tokens import (
+    REFRESH_COOKIE,
+    create_refresh_token,
+    new_token_id,
+    revoke_token,
+    rotate_refresh_token,
+    set_refresh_cookie,
+    token_claims,
+)
 from utils import get_current_user_id, verify_telegram_auth
 
 from .schema import (
@@ -22,9 +31,11 @@ from .schema import (
 router = APIRouter(prefix="/api", tags=["user"])
 
 
-def create_jwt(user_id: int) -> str:
+def create_jwt(user_id: int, family: str | None = None) -> str:
     payload = {
         "sub": str(user_id),
+        "role": "participant",
+        **token_claims(family),
         "iat": int(time.time()),
         "exp": int(time.time()) + JWT_EXPIRE_MINUTES * 60,
     }
@@ -52,16 +63,46 @@ async def telegram_auth(
         photo_url=data.get("photo_url"),
     )
 
-    token = create_jwt(user_id=user.id)
+    return token_response(user.id, new_token_id())
+
+
+# refresh-кука уходит только на /api/user/refresh и /api/user/logout
+USER_AUTH_PATH = "/api/user"
+
+
+def token_response(user_id: int, family: str) -> Response:
     response = Response(status_code=200)
     response.set_cookie(
         key="access_token",
-        value=token,
+        value=create_jwt(user_id=user_id, family=family),
         httponly=False,
         max_age=JWT_EXPIRE_MINUTES * 60,
         samesite="lax",
         secure=False,  # временно
     )
+    set_refresh_cookie(
+        response, create_refresh_token(user_id, "participant", family), path=USER_AUTH_PATH
+    )
+    return response
+
+
+@router.post("/user/refresh")
+async def refresh_user_token(request: Request) -> Response:
+    token = request.cookies.get(REFRESH_COOKIE)
+    if not token:
+        raise HTTPException(status_code=401, detail="Missing refresh_token cookie")
+
+    payload = await rotate_refresh_token(token, role="participant")
+    return token_response(int(payload["sub"]), payload["fam"])
+
+
+@router.post("/user/logout")
+async def logout_user(request: Request) -> Response:
+    # отзывается вся цепочка: и refresh-токен, и выданные с ним access-токены
+    await revoke_token(request.cookies.get(REFRESH_COOKIE) or request.cookies.get("access_token"))
+    response = Response(status_code=200)
+    response.delete_cookie(key="access_token")
+    response.delete_cookie(key=REFRESH_COOKIE, path=USER_AUTH_PATH)
     return response
 
 
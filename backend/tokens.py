@@ -0,0 +1,111 @@
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import jwt
+from fastapi import HTTPException, Response, status
+
+from config import REFRESH_TOKEN_DAYS, SECRET_KEY
+from revocation import revocations
+
+ALGORITHM = "HS256"
+REFRESH_COOKIE = "refresh_token"
+REFRESH_TTL = REFRESH_TOKEN_DAYS * 24 * 3600
+
+# Токены одного входа образуют цепочку (claim fam): каждый refresh-токен обменивается
+# ровно один раз на новую пару, а выход или повторное предъявление уже обменянного
+# токена отзывают всю цепочку вместе с выданными в ней access-токенами.
+
+
+def new_token_id() -> str:
+    return uuid.uuid4().hex
+
+
+def token_claims(family: str | None = None) -> dict:
+    # jti — для отзыва одного токена, fam — для отзыва всей цепочки
+    return {"jti": new_token_id(), "fam": family or new_token_id()}
+
+
+def create_refresh_token(sub: int | str, role: str, family: str) -> str:
+    now = int(time.time())
+    payload = {
+        "sub": str(sub),
+        "role": role,
+        "type": "refresh",
+        **token_claims(family),
+        "iat": now,
+        "exp": now + REFRESH_TTL,
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def family_id(family: str) -> str:
+    return f"fam:{family}"
+
+
+async def is_token_revoked(payload: dict) -> bool:
+    # у токенов, выданных до появления jti/fam, отзывать нечего
+    token_ids = []
+    if payload.get("jti"):
+        token_ids.append(payload["jti"])
+    if payload.get("fam"):
+        token_ids.append(family_id(payload["fam"]))
+    return bool(token_ids) and await revocations.is_revoked(*token_ids)
+
+
+async def revoke_family(family: str) -> None:
+    # цепочка живёт не дольше последнего выданного в ней refresh-токена
+    expires_at = datetime.now(UTC) + timedelta(seconds=REFRESH_TTL)
+    await revocations.revoke({family_id(family): expires_at})
+
+
+async def rotate_refresh_token(token: str, role: str) -> dict:
+    """Проверяет refresh-токен и помечает его обменянным; возвращает его claims.
+
+    Новую пару выдаёт вызывающий код с тем же fam.
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.PyJWTError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Неверный или просроченный токен"
+        ) from exc
+    if payload.get("type") != "refresh" or payload.get("role") != role or "jti" not in payload:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Неверный токен")
+    if await revocations.is_revoked(family_id(payload["fam"])):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Токен отозван")
+
+    # вставка в revoked_tokens атомарна: из двух обменов одного токена проходит один
+    expires_at = datetime.fromtimestamp(payload["exp"], UTC)
+    if payload["jti"] not in await revocations.revoke({payload["jti"]: expires_at}):
+        # токен уже обменивали — его, вероятно, украли: закрываем всю цепочку
+        await revoke_family(payload["fam"])
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Токен отозван")
+    return payload
+
+
+async def revoke_token(token: str | None) -> None:
+    """Выход: отзывает цепочку токена (подпись проверяется, срок — нет)."""
+    if not token:
+        return
+    try:
+        payload = jwt.decode(
+            token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False}
+        )
+    except jwt.PyJWTError:
+        return
+    if payload.get("fam"):
+        await revoke_family(payload["fam"])
+
+
+def set_refresh_cookie(response: Response, token: str, path: str) -> None:
+    # refresh-токен уходит только на свои эндпоинты (path), а не с каждым запросом
+    response.set_cookie(
+        key=REFRESH_COOKIE,
+        value=token,
+        httponly=True,
+        max_age=REFRESH_TTL,
+        samesite="lax",
+        secure=False,  # В продакшене должно быть True при HTTPS
+        path=path,
+    )
@@ -1,11 +1,15 @@
 import hashlib
 import hmac
 import time
+from collections.abc import AsyncGenerator
 
 import jwt
 from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 from config import SECRET_KEY
+from tokens import is_token_revoked
 
 
 def verify_telegram_auth(payload: dict, bot_token: str) -> bool:
@@ -36,7 +40,7 @@ def verify_telegram_auth(payload: dict, bot_token: str) -> bool:
     return hmac.compare_digest(hmac_hash, received_hash)
 
 
-def get_current_user_id(request: Request) -> int:
+async def get_current_user_id(request: Request) -> int:
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail="Missing access_token cookie")
@@ -46,8 +50,29 @@ def get_current_user_id(request: Request) -> int:
     except jwt.PyJWTError as exc:
         raise HTTPException(status_code=401, detail="Invalid token") from exc
 
+    # токены организаторов и refresh-токены подписаны тем же ключом
+    if payload.get("role") == "organizer" or payload.get("type") == "refresh":
+        raise HTTPException(status_code=401, detail="Invalid token")
+
     user_id = payload.get("sub")
     if user_id is None:
         raise HTTPException(status_code=401, detail="user_id not found")
 
+    # фильтр отзыва в памяти: в БД идём только при его срабатывании
+    if await is_token_revoked(payload):
+        raise HTTPException(status_code=401, detail="Token revoked")
+
     return int(user_id)
+
+
+def streaming_response(chunks: AsyncGenerator, **kwargs) -> StreamingResponse:
+    """StreamingResponse, закрывающий генератор и при обрыве соединения.
+
+    Starlette при отключении клиента бросает генератор недочитанным, и его
+    finally/async with (сессия БД, подписка) ждали бы сборщика мусора.
+    """
+
+    async def close() -> None:
+        await chunks.aclose()
+
+    return StreamingResponse(chunks, background=BackgroundTask(close), **kwargs)